@@ -1,11 +1,119 @@
+import copy
+import http.cookiejar
+import inspect
 import os
+import random
+import string
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# Load environment variables
-load_dotenv()
+try:
+    import orjson  # Optional: much faster decoding of large responses
+except ImportError:
+    orjson = None
+
+# Upper bound on in-flight requests for bulk helpers
+MAX_CONCURRENT_REQUESTS = 8
+# Keep-alive connections held per host; larger than the bulk worker count so
+# concurrent requests reuse warm sockets instead of opening throwaway ones
+CONNECTION_POOL_SIZE = 16
+# How long read-mostly responses (roles, organizations, cdFMC domain) are reused
+CACHE_TTL_SECONDS = 300
+
+# Retry policy for rate limits (429) and transient server/network failures
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these are retried after a 5xx or network error; a 429 is always safe to retry
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+# Client-side cap that keeps bursts under the API's published rate limit
+RATE_LIMIT_PER_SECOND = 9
+
+_json_loads = orjson.loads if orjson else json.loads
+
+def _retry_delay(attempt, response=None):
+    """Seconds to wait before the next retry: Retry-After if given, else jittered exponential backoff"""
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def _get_shared_session():
+    """Module-wide requests session so all client instances share one connection pool.
+
+    Cookies are not kept: the session is shared by clients with different
+    credentials, and a cookie set for one must not be sent with another's requests.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_maxsize=CONNECTION_POOL_SIZE))
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                _shared_session = session
+    return _shared_session
+
+class _RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the next request may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative reserves a future slot for this caller
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class _Endpoint:
+    """Declarative client method built from an HTTP verb and a URL template
+    
+    `get_thing = _Endpoint("GET", "/things/{thing_id}", "doc")` in a class body
+    becomes a real method `get_thing(self, thing_id)` when the class is created;
+    the template placeholders, in order, are its positional arguments.
+    """
+    
+    def __init__(self, verb, template, doc, **request_kwargs):
+        parsed = list(string.Formatter().parse(template))
+        fields = [name for _, name, _, _ in parsed if name]
+        # Positional "{}" form so calls skip building a kwargs dict
+        path = "".join(literal + ("{}" if name else "") for literal, name, _, _ in parsed)
+        signature = inspect.Signature(
+            [inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD) for name in ["self", *fields]])
+        
+        def method(self, *args, **kwargs):
+            if kwargs or len(args) != len(fields):
+                args = signature.bind(self, *args, **kwargs).args[1:]
+            return self._make_request(verb, path.format(*args), **request_kwargs)
+        
+        method.__doc__ = doc
+        method.__signature__ = signature
+        self.method = method
+    
+    def __set_name__(self, owner, name):
+        # Swap in the plain function so calls pay no descriptor overhead
+        self.method.__name__ = name
+        self.method.__qualname__ = f"{owner.__name__}.{name}"
+        setattr(owner, name, self.method)
 
 def format_as_markdown_table(items, headers, key_mapping):
     """Convert list of dictionaries to markdown table format.
@@ -21,27 +129,36 @@ def format_as_markdown_table(items, headers, key_mapping):
     if not items:
         return "No items found."
     
-    # Build header row
-    table = "| " + " | ".join(headers) + " |\n"
-    # Build separator row
-    table += "|" + "|".join(["---"] * len(headers)) + "|\n"
+    keys = [key_mapping.get(header, header.lower()) for header in headers]
+    
+    # Header and separator rows
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join(["---"] * len(headers)) + "|",
+    ]
     
-    # Build data rows
+    # Data rows, collected and joined once rather than concatenated per row
     for idx, item in enumerate(items, 1):
-        row_values = []
-        for header in headers:
-            key = key_mapping.get(header, header.lower())
-            if key == "#":
-                row_values.append(str(idx))
-            else:
-                value = item.get(key, "N/A")
-                row_values.append(str(value))
-        table += "| " + " | ".join(row_values) + " |\n"
-    
-    return table
+        row_values = [str(idx) if key == "#" else str(item.get(key, "N/A")) for key in keys]
+        lines.append("| " + " | ".join(row_values) + " |")
+    
+    return "\n".join(lines) + "\n"
 
 class CiscoSCCClient:
+    # HTTP verbs accepted by _make_request
+    _VERBS = {
+        "GET": requests.Session.get,
+        "POST": requests.Session.post,
+        "PUT": requests.Session.put,
+        "DELETE": requests.Session.delete,
+    }
+    
     def __init__(self):
+        # Only look for a .env file when the environment doesn't already provide credentials
+        if not (os.getenv('CISCO_API_KEY_ID') and os.getenv('CISCO_ACCESS_TOKEN')):
+            from dotenv import load_dotenv
+            load_dotenv()
+        
         self.api_key_id = os.getenv('CISCO_API_KEY_ID')
         self.access_token = os.getenv('CISCO_ACCESS_TOKEN')
         self.refresh_token = os.getenv('CISCO_REFRESH_TOKEN')
@@ -51,51 +168,118 @@ class CiscoSCCClient:
         
         self.base_url = "https://api.security.cisco.com/v1"
         self.org_id = "d1dbb9db-29f4-4547-9de5-3b436015f0f0"  # From token
-        self.session = requests.Session()
         self._setup_headers()
+        self._limiter = _RateLimiter(RATE_LIMIT_PER_SECOND)
+        self._cache = {}
+    
+    @property
+    def session(self):
+        """HTTP session shared by every client in this module, opened on first use"""
+        return _get_shared_session()
     
     def _setup_headers(self):
-        """Setup authorization headers"""
-        self.session.headers.update({
+        """Build authorization headers once; they are passed with every request"""
+        self._headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
-        })
+        }
+    
+    def _send(self, verb, method, url, **kwargs):
+        """Send a request, retrying rate limits and transient failures with backoff"""
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(MAX_RETRIES + 1):
+            last_attempt = attempt == MAX_RETRIES
+            self._limiter.acquire()
+            try:
+                response = verb(self.session, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt or not idempotent:
+                    raise
+                time.sleep(_retry_delay(attempt))
+                continue
+            
+            status = response.status_code
+            if last_attempt or status not in RETRY_STATUS_CODES or (status != 429 and not idempotent):
+                return response
+            time.sleep(_retry_delay(attempt, response))
     
     def _make_request(self, method, endpoint, data=None, params=None):
         """Make HTTP request to Cisco SCC API"""
         url = f"{self.base_url}{endpoint}"
         
+        method = method.upper()
+        verb = self._VERBS.get(method)
+        if verb is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         try:
-            if method.upper() == "GET":
-                response = self.session.get(url, params=params, timeout=30)
-            elif method.upper() == "POST":
-                response = self.session.post(url, json=data, params=params, timeout=30)
-            elif method.upper() == "PUT":
-                response = self.session.put(url, json=data, params=params, timeout=30)
-            elif method.upper() == "DELETE":
-                response = self.session.delete(url, params=params, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json() if response.text else {"status": "success"}
+            response = self._send(verb, method, url, headers=self._headers, json=data, params=params, timeout=30)
+            status = response.status_code
+            if status >= 400:
+                return {
+                    "error": f"HTTP {status}",
+                    "url": url,
+                    "method": method,
+                    "status_code": status,
+                    "body": response.text[:500]
+                }
+            if not response.content:
+                return {"status": "success"}
+            try:
+                return _json_loads(response.content)
+            except ValueError as e:
+                # A 2xx body that is not JSON, e.g. an HTML page from a proxy
+                return {
+                    "error": f"Invalid JSON in response: {e}",
+                    "url": url,
+                    "method": method,
+                    "status_code": status,
+                    "body": response.text[:500]
+                }
         
         except requests.exceptions.RequestException as e:
             return {
                 "error": str(e),
                 "url": url,
                 "method": method,
-                "status_code": getattr(e.response, 'status_code', None)
+                "status_code": getattr(getattr(e, "response", None), "status_code", None)
             }
     
+    def _cached_get(self, endpoint, **kwargs):
+        """GET a read-mostly endpoint, reusing a successful response for CACHE_TTL_SECONDS
+        
+        Every call returns its own copy, so a caller that modifies the result
+        does not change what later reads see.
+        """
+        now = time.monotonic()
+        hit = self._cache.get(endpoint)
+        if hit and now - hit[0] < CACHE_TTL_SECONDS:
+            return copy.deepcopy(hit[1])
+        result = self._make_request("GET", endpoint, **kwargs)
+        if "error" not in result:
+            self._cache[endpoint] = (now, result)
+            return copy.deepcopy(result)
+        return result
+    
+    def clear_cache(self):
+        """Drop cached responses so the next read goes to the API"""
+        self._cache.clear()
+    
+    def bulk_get(self, endpoints, params=None, max_workers=MAX_CONCURRENT_REQUESTS):
+        """GET several endpoints concurrently
+        
+        Results are returned in the same order as endpoints. Failed calls come
+        back as error dicts, exactly like _make_request.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda ep: self._make_request("GET", ep, params=params), endpoints))
+    
     # Organization Operations
     def list_organizations(self):
         """List all organizations"""
-        return self._make_request("GET", "/organizations")
+        return self._cached_get("/organizations")
     
-    def get_organization(self, org_id):
-        """Get organization details"""
-        return self._make_request("GET", f"/organizations/{org_id}")
+    get_organization = _Endpoint("GET", "/organizations/{org_id}", "Get organization details")
     
     def create_organization(self, name, org_type="managed", description=None):
         """Create new organization"""
@@ -106,20 +290,24 @@ class CiscoSCCClient:
         if description:
             payload["description"] = description
         
-        return self._make_request("POST", "/organizations", data=payload)
+        result = self._make_request("POST", "/organizations", data=payload)
+        self.clear_cache()
+        return result
     
     def update_organization(self, org_id, **kwargs):
         """Update organization"""
-        return self._make_request("PUT", f"/organizations/{org_id}", data=kwargs)
+        result = self._make_request("PUT", f"/organizations/{org_id}", data=kwargs)
+        self.clear_cache()
+        return result
     
     def delete_organization(self, org_id):
         """Delete organization"""
-        return self._make_request("DELETE", f"/organizations/{org_id}")
+        result = self._make_request("DELETE", f"/organizations/{org_id}")
+        self.clear_cache()
+        return result
     
     # User Management
-    def list_users(self, org_id):
-        """List users in organization"""
-        return self._make_request("GET", f"/organizations/{org_id}/users")
+    list_users = _Endpoint("GET", "/organizations/{org_id}/users", "List users in organization")
     
     def add_user(self, org_id, email, role="user"):
         """Add user to organization"""
@@ -129,9 +317,7 @@ class CiscoSCCClient:
         }
         return self._make_request("POST", f"/organizations/{org_id}/users", data=payload)
     
-    def remove_user(self, org_id, user_id):
-        """Remove user from organization"""
-        return self._make_request("DELETE", f"/organizations/{org_id}/users/{user_id}")
+    remove_user = _Endpoint("DELETE", "/organizations/{org_id}/users/{user_id}", "Remove user from organization")
     
     def assign_role(self, org_id, user_id, role_id):
         """Assign role to user"""
@@ -139,51 +325,46 @@ class CiscoSCCClient:
         return self._make_request("PUT", f"/organizations/{org_id}/users/{user_id}/role", data=payload)
     
     # Subscription Management
-    def list_subscriptions(self, org_id):
-        """List subscriptions for organization"""
-        return self._make_request("GET", f"/organizations/{org_id}/subscriptions")
+    list_subscriptions = _Endpoint("GET", "/organizations/{org_id}/subscriptions", "List subscriptions for organization")
     
-    def get_subscription(self, org_id, subscription_id):
-        """Get subscription details"""
-        return self._make_request("GET", f"/organizations/{org_id}/subscriptions/{subscription_id}")
+    get_subscription = _Endpoint("GET", "/organizations/{org_id}/subscriptions/{subscription_id}", "Get subscription details")
     
     # Role Management
     def list_roles(self, org_id):
         """List available roles in organization"""
-        return self._make_request("GET", f"/organizations/{org_id}/roles")
+        return self._cached_get(f"/organizations/{org_id}/roles")
     
     def get_role(self, org_id, role_id):
         """Get role details and permissions"""
-        return self._make_request("GET", f"/organizations/{org_id}/roles/{role_id}")
+        return self._cached_get(f"/organizations/{org_id}/roles/{role_id}")
 
-    def list_admin_groups(self, org_id):
-        """List admin groups in organization"""
-        return self._make_request("GET", f"/organizations/{org_id}/adminGroups")
+    list_admin_groups = _Endpoint("GET", "/organizations/{org_id}/adminGroups", "List admin groups in organization")
 
 if __name__ == "__main__":
     import sys
     
-    client = CiscoSCCClient()
+    # action -> (method, number of required positional arguments)
+    COMMANDS = {
+        "list_organizations": (CiscoSCCClient.list_organizations, 0),
+        "list_users": (CiscoSCCClient.list_users, 1),
+        "list_subscriptions": (CiscoSCCClient.list_subscriptions, 1),
+        "list_roles": (CiscoSCCClient.list_roles, 1),
+    }
     
     if len(sys.argv) < 2:
         print("Usage: python cisco_scc.py <action> [org_id] [user_id] [role_id]")
-        print("Actions: list_organizations, list_users, list_subscriptions, etc.")
+        print("Actions: " + ", ".join(COMMANDS))
         sys.exit(1)
     
-    action = sys.argv[1]
-    org_id = sys.argv[2] if len(sys.argv) > 2 else None
-    user_id = sys.argv[3] if len(sys.argv) > 3 else None
-    
-    # Route to appropriate method
-    if action == "list_organizations":
-        result = client.list_organizations()
-    elif action == "list_users" and org_id:
-        result = client.list_users(org_id)
-    elif action == "list_subscriptions" and org_id:
-        result = client.list_subscriptions(org_id)
-    elif action == "list_roles" and org_id:
-        result = client.list_roles(org_id)
-    else:
+    action, args = sys.argv[1], sys.argv[2:]
+    method, argc = COMMANDS.get(action, (None, 0))
+    
+    if method is None or len(args) < argc:
         result = {"error": f"Unknown action: {action}"}
+    else:
+        result = method(CiscoSCCClient(), *args[:argc])
     
-    print(json.dumps(result, indent=2))
+    if orjson:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2) + b"\n")
+    else:
+        print(json.dumps(result, indent=2))
@@ -1,10 +1,120 @@
+import copy
+import http.cookiejar
+import inspect
 import os
+import random
+import string
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+try:
+    import orjson  # Optional: much faster decoding of large responses
+except ImportError:
+    orjson = None
+
+# Upper bound on in-flight requests for bulk helpers
+MAX_CONCURRENT_REQUESTS = 8
+# Keep-alive connections held per host; larger than the bulk worker count so
+# concurrent requests reuse warm sockets instead of opening throwaway ones
+CONNECTION_POOL_SIZE = 16
+# How long read-mostly responses (roles, organizations, cdFMC domain) are reused
+CACHE_TTL_SECONDS = 300
+
+# Retry policy for rate limits (429) and transient server/network failures
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these are retried after a 5xx or network error; a 429 is always safe to retry
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+# Client-side cap that keeps bursts under the API's published rate limit
+RATE_LIMIT_PER_SECOND = 9
+# cdFMC endpoints are a separate API with their own limit, so they get their own bucket
+CDFMC_RATE_LIMIT_PER_SECOND = 9
+
+_json_loads = orjson.loads if orjson else json.loads
+
+def _retry_delay(attempt, response=None):
+    """Seconds to wait before the next retry: Retry-After if given, else jittered exponential backoff"""
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def _get_shared_session():
+    """Module-wide requests session so all client instances share one connection pool.
+
+    Cookies are not kept: the session is shared by clients with different
+    credentials, and a cookie set for one must not be sent with another's requests.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_maxsize=CONNECTION_POOL_SIZE))
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                _shared_session = session
+    return _shared_session
+
+class _RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the next request may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative reserves a future slot for this caller
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class _Endpoint:
+    """Declarative client method built from an HTTP verb and a URL template
+    
+    `get_thing = _Endpoint("GET", "/things/{thing_id}", "doc")` in a class body
+    becomes a real method `get_thing(self, thing_id)` when the class is created;
+    the template placeholders, in order, are its positional arguments.
+    """
+    
+    def __init__(self, verb, template, doc, **request_kwargs):
+        parsed = list(string.Formatter().parse(template))
+        fields = [name for _, name, _, _ in parsed if name]
+        # Positional "{}" form so calls skip building a kwargs dict
+        path = "".join(literal + ("{}" if name else "") for literal, name, _, _ in parsed)
+        signature = inspect.Signature(
+            [inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD) for name in ["self", *fields]])
+        
+        def method(self, *args, **kwargs):
+            if kwargs or len(args) != len(fields):
+                args = signature.bind(self, *args, **kwargs).args[1:]
+            return self._make_request(verb, path.format(*args), **request_kwargs)
+        
+        method.__doc__ = doc
+        method.__signature__ = signature
+        self.method = method
+    
+    def __set_name__(self, owner, name):
+        # Swap in the plain function so calls pay no descriptor overhead
+        self.method.__name__ = name
+        self.method.__qualname__ = f"{owner.__name__}.{name}"
+        setattr(owner, name, self.method)
 
 def format_as_markdown_table(items, headers, key_mapping):
     """Convert list of dictionaries to markdown table format.
@@ -20,27 +130,38 @@ def format_as_markdown_table(items, headers, key_mapping):
     if not items:
         return "No items found."
     
-    # Build header row
-    table = "| " + " | ".join(headers) + " |\n"
-    # Build separator row
-    table += "|" + "|".join(["---"] * len(headers)) + "|\n"
+    keys = [key_mapping.get(header, header.lower()) for header in headers]
     
-    # Build data rows
+    # Header and separator rows
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join(["---"] * len(headers)) + "|",
+    ]
+    
+    # Data rows, collected and joined once rather than concatenated per row
     for idx, item in enumerate(items, 1):
-        row_values = []
-        for header in headers:
-            key = key_mapping.get(header, header.lower())
-            if key == "#":
-                row_values.append(str(idx))
-            else:
-                value = item.get(key, "N/A")
-                row_values.append(str(value))
-        table += "| " + " | ".join(row_values) + " |\n"
-    
-    return table
+        row_values = [str(idx) if key == "#" else str(item.get(key, "N/A")) for key in keys]
+        lines.append("| " + " | ".join(row_values) + " |")
+    
+    return "\n".join(lines) + "\n"
 
 class CiscoSCCFirewallManager:
+    # HTTP verbs accepted by _make_request
+    _VERBS = {
+        "GET": requests.Session.get,
+        "POST": requests.Session.post,
+        "PATCH": requests.Session.patch,
+        "PUT": requests.Session.put,
+        "DELETE": requests.Session.delete,
+    }
+    
     def __init__(self, region="us"):
+        # Only look for a .env file when the environment doesn't already provide credentials
+        if not (os.getenv('CISCO_API_KEY_ID') and os.getenv('CISCO_ACCESS_TOKEN')
+                and os.getenv('CISCO_CDFMC_ACCESS_TOKEN')):
+            from dotenv import load_dotenv
+            load_dotenv()
+        
         # Organization/SCC API token
         self.api_key_id = os.getenv('CISCO_API_KEY_ID')
         self.access_token = os.getenv('CISCO_ACCESS_TOKEN')
@@ -54,17 +175,52 @@ class CiscoSCCFirewallManager:
         # Support multi-region deployment
         self.region = region
         self.base_url = f"https://api.{region}.security.cisco.com/firewall/v1"
-        self.session = requests.Session()
         self._setup_headers()
+        self._cdfmc_url = f"{self.base_url}/cdfmc/"
+        self._limiter = _RateLimiter(RATE_LIMIT_PER_SECOND)
+        self._cdfmc_limiter = _RateLimiter(CDFMC_RATE_LIMIT_PER_SECOND)
+        self._cache = {}
+    
+    @property
+    def session(self):
+        """HTTP session shared by every client in this module, opened on first use"""
+        return _get_shared_session()
+    
+    def _setup_headers(self):
+        """Build authorization headers once - cdFMC endpoints use the cdFMC token
+        
+        Headers are passed per request rather than stored on the session, so
+        switching tokens never mutates shared state under concurrent requests.
+        """
+        def headers(token):
+            return {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+        
+        self._headers = headers(self.access_token)
+        self._cdfmc_headers = headers(self.cdfmc_token) if self.cdfmc_token else self._headers
     
-    def _setup_headers(self, use_cdfmc_token=False):
-        """Setup authorization headers - use cdFMC token for FMC endpoints"""
-        token = self.cdfmc_token if use_cdfmc_token and self.cdfmc_token else self.access_token
-        self.session.headers.update({
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        })
+    def _send(self, verb, method, url, **kwargs):
+        """Send a request, retrying rate limits and transient failures with backoff"""
+        idempotent = method in IDEMPOTENT_METHODS
+        limiter = self._cdfmc_limiter if url.startswith(self._cdfmc_url) else self._limiter
+        for attempt in range(MAX_RETRIES + 1):
+            last_attempt = attempt == MAX_RETRIES
+            limiter.acquire()
+            try:
+                response = verb(self.session, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt or not idempotent:
+                    raise
+                time.sleep(_retry_delay(attempt))
+                continue
+            
+            status = response.status_code
+            if last_attempt or status not in RETRY_STATUS_CODES or (status != 429 and not idempotent):
+                return response
+            time.sleep(_retry_delay(attempt, response))
     
     def _make_request(self, method, endpoint, data=None, params=None, use_cdfmc_token=False):
         """Make HTTP request to Cisco SCC/cdFMC API
@@ -72,37 +228,127 @@ class CiscoSCCFirewallManager:
         Args:
             use_cdfmc_token: If True, uses cdFMC token instead of org token
         """
-        # Switch token if this is a cdFMC endpoint
-        if use_cdfmc_token:
-            self._setup_headers(use_cdfmc_token=True)
-        
         url = f"{self.base_url}{endpoint}"
+        headers = self._cdfmc_headers if use_cdfmc_token else self._headers
+        
+        method = method.upper()
+        verb = self._VERBS.get(method)
+        if verb is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
         try:
-            if method.upper() == "GET":
-                response = self.session.get(url, params=params, timeout=30)
-            elif method.upper() == "POST":
-                response = self.session.post(url, json=data, params=params, timeout=30)
-            elif method.upper() == "PATCH":
-                response = self.session.patch(url, json=data, params=params, timeout=30)
-            elif method.upper() == "PUT":
-                response = self.session.put(url, json=data, params=params, timeout=30)
-            elif method.upper() == "DELETE":
-                response = self.session.delete(url, params=params, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json() if response.text else {"status": "success"}
+            response = self._send(verb, method, url, headers=headers, json=data, params=params, timeout=30)
+            status = response.status_code
+            if status >= 400:
+                return {
+                    "error": f"HTTP {status}",
+                    "url": url,
+                    "method": method,
+                    "status_code": status,
+                    "body": response.text[:500]
+                }
+            if not response.content:
+                return {"status": "success"}
+            try:
+                return _json_loads(response.content)
+            except ValueError as e:
+                # A 2xx body that is not JSON, e.g. an HTML page from a proxy
+                return {
+                    "error": f"Invalid JSON in response: {e}",
+                    "url": url,
+                    "method": method,
+                    "status_code": status,
+                    "body": response.text[:500]
+                }
         
         except requests.exceptions.RequestException as e:
             return {
                 "error": str(e),
                 "url": url,
                 "method": method,
-                "status_code": getattr(e.response, 'status_code', None)
+                "status_code": getattr(getattr(e, "response", None), "status_code", None)
             }
     
+    def _cached_get(self, endpoint, **kwargs):
+        """GET a read-mostly endpoint, reusing a successful response for CACHE_TTL_SECONDS
+        
+        Every call returns its own copy, so a caller that modifies the result
+        does not change what later reads see.
+        """
+        now = time.monotonic()
+        hit = self._cache.get(endpoint)
+        if hit and now - hit[0] < CACHE_TTL_SECONDS:
+            return copy.deepcopy(hit[1])
+        result = self._make_request("GET", endpoint, **kwargs)
+        if "error" not in result:
+            self._cache[endpoint] = (now, result)
+            return copy.deepcopy(result)
+        return result
+    
+    def clear_cache(self):
+        """Drop cached responses so the next read goes to the API"""
+        self._cache.clear()
+    
+    def bulk_get(self, endpoints, params=None, use_cdfmc_token=False, max_workers=MAX_CONCURRENT_REQUESTS):
+        """GET several endpoints concurrently
+        
+        Results are returned in the same order as endpoints. Failed calls come
+        back as error dicts, exactly like _make_request.
+        
+        Args:
+            use_cdfmc_token: If True, uses cdFMC token for every request in the batch
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(
+                lambda ep: self._make_request("GET", ep, params=params, use_cdfmc_token=use_cdfmc_token),
+                endpoints))
+    
+    def iter_pages(self, endpoint, params=None, page_size=50, use_cdfmc_token=False,
+                   max_workers=MAX_CONCURRENT_REQUESTS):
+        """Yield every item from a limit/offset paginated endpoint
+        
+        The first page is fetched on its own to learn the total count, then the
+        remaining pages are fetched max_workers at a time and yielded in order.
+        Works with both SCC pages ({"count": N}) and cdFMC pages ({"paging": {"count": N}}).
+        
+        Args:
+            endpoint: Paginated endpoint (e.g. "/inventory/devices")
+            params: Extra query parameters sent with every page
+            page_size: Items requested per page
+            use_cdfmc_token: If True, uses cdFMC token instead of org token
+        
+        Raises:
+            RuntimeError: If any page comes back as an error
+        """
+        params = dict(params or {})
+        
+        def fetch(offset):
+            page = self._make_request("GET", endpoint,
+                                      params={**params, "limit": page_size, "offset": offset},
+                                      use_cdfmc_token=use_cdfmc_token)
+            if "error" in page:
+                raise RuntimeError(f"Failed to fetch {endpoint} at offset {offset}: {page['error']}")
+            return page
+        
+        first = fetch(0)
+        yield from first.get("items", [])
+        
+        total = first.get("count", first.get("paging", {}).get("count"))
+        if total is None:
+            # No total reported: walk pages one at a time until a short page
+            offset, items = 0, first.get("items", [])
+            while len(items) == page_size:
+                offset += page_size
+                items = fetch(offset).get("items", [])
+                yield from items
+            return
+        
+        offsets = list(range(page_size, total, page_size))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for start in range(0, len(offsets), max_workers):
+                for page in pool.map(fetch, offsets[start:start + max_workers]):
+                    yield from page.get("items", [])
+    
     # Inventory Management
     def list_devices(self, limit=50, offset=0):
         """List all devices in inventory
@@ -112,9 +358,7 @@ class CiscoSCCFirewallManager:
         return self._make_request("GET", "/inventory/devices", 
                                 params={"limit": limit, "offset": offset})
     
-    def get_device(self, device_uid):
-        """Get device details"""
-        return self._make_request("GET", f"/inventory/devices/{device_uid}")
+    get_device = _Endpoint("GET", "/inventory/devices/{device_uid}", "Get device details")
     
     def list_managers(self, query=None, limit=50, offset=0):
         """List device managers (FMC, etc.)"""
@@ -137,8 +381,7 @@ class CiscoSCCFirewallManager:
         Endpoint: /cdfmc/api/fmc_platform/v1/info/domain
         """
         endpoint = "/cdfmc/api/fmc_platform/v1/info/domain"
-        return self._make_request("GET", endpoint, use_cdfmc_token=True)
-    
+        return self._cached_get(endpoint, use_cdfmc_token=True)
     
     def list_services(self, limit=50, offset=0):
         """List cloud services"""
@@ -161,10 +404,9 @@ class CiscoSCCFirewallManager:
                                 params={"limit": limit, "offset": offset}, 
                                 use_cdfmc_token=True)
     
-    def get_cdfmc_access_policy(self, domain_uid, policy_id):
-        """Get specific access policy from cdFMC"""
-        endpoint = f"/cdfmc/api/fmc_config/v1/domain/{domain_uid}/policy/accesspolicies/{policy_id}"
-        return self._make_request("GET", endpoint, use_cdfmc_token=True)
+    get_cdfmc_access_policy = _Endpoint(
+        "GET", "/cdfmc/api/fmc_config/v1/domain/{domain_uid}/policy/accesspolicies/{policy_id}",
+        "Get specific access policy from cdFMC", use_cdfmc_token=True)
     
     def get_cdfmc_access_rules(self, domain_uid, policy_id, expanded=False):
         """Get access rules for a policy in cdFMC"""
@@ -172,6 +414,42 @@ class CiscoSCCFirewallManager:
         params = {"expanded": "true" if expanded else "false"}
         return self._make_request("GET", endpoint, params=params, use_cdfmc_token=True)
     
+    def get_cdfmc_policies_with_rules(self, expanded=False, max_workers=MAX_CONCURRENT_REQUESTS):
+        """Get every cdFMC access policy together with its access rules
+        
+        Looks up the (cached) domain UUID, pages through all access policies,
+        then fetches each policy's rules concurrently.
+        
+        Args:
+            expanded: Return fully expanded rule objects
+            max_workers: Maximum number of rule lookups in flight at once
+        
+        Returns:
+            {"items": [{**policy, "rules": <get_cdfmc_access_rules response>}, ...]}
+            or an error dict if the domain or policy lookup fails
+        """
+        domain = self.get_cdfmc_domain()
+        if "error" in domain:
+            return domain
+        items = domain.get("items") if isinstance(domain, dict) else None
+        if not items or "uuid" not in items[0]:
+            return {"error": "cdFMC domain lookup returned no domain UUID", "response": domain}
+        domain_uid = items[0]["uuid"]
+        
+        try:
+            policies = list(self.iter_pages(
+                f"/cdfmc/api/fmc_config/v1/domain/{domain_uid}/policy/accesspolicies",
+                use_cdfmc_token=True, max_workers=max_workers))
+        except RuntimeError as e:
+            return {"error": str(e)}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rules = pool.map(
+                lambda policy: self.get_cdfmc_access_rules(domain_uid, policy["id"], expanded),
+                policies)
+            return {"items": [{**policy, "rules": policy_rules}
+                              for policy, policy_rules in zip(policies, rules)]}
+    
     def get_cdfmc_network_objects(self, domain_uid, limit=50, offset=0):
         """Get network objects from cdFMC"""
         endpoint = f"/cdfmc/api/fmc_config/v1/domain/{domain_uid}/object/networks"
@@ -187,9 +465,7 @@ class CiscoSCCFirewallManager:
             params["type"] = object_type
         return self._make_request("GET", "/objects", params=params)
     
-    def get_object(self, object_uid):
-        """Get object details"""
-        return self._make_request("GET", f"/objects/{object_uid}")
+    get_object = _Endpoint("GET", "/objects/{object_uid}", "Get object details")
     
     # Deployment/Changes
     def deploy_config(self, device_uid, config_data):
@@ -198,18 +474,14 @@ class CiscoSCCFirewallManager:
                                 data=config_data)
     
     # Monitoring
-    def get_device_health(self, device_uid):
-        """Get device health status"""
-        return self._make_request("GET", f"/inventory/devices/{device_uid}/health")
+    get_device_health = _Endpoint("GET", "/inventory/devices/{device_uid}/health", "Get device health status")
     
     def list_transactions(self, limit=50, offset=0):
         """List asynchronous transactions"""
         return self._make_request("GET", "/transactions", 
                                 params={"limit": limit, "offset": offset})
     
-    def get_transaction(self, transaction_id):
-        """Get transaction status"""
-        return self._make_request("GET", f"/transactions/{transaction_id}")
+    get_transaction = _Endpoint("GET", "/transactions/{transaction_id}", "Get transaction status")
     
     # Search
     def search(self, query, resource_type=None):
@@ -251,4 +523,7 @@ if __name__ == "__main__":
     else:
         result = {"error": f"Unknown action: {action}"}
     
-    print(json.dumps(result, indent=2))
+    if orjson:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2) + b"\n")
+    else:
+        print(json.dumps(result, indent=2))
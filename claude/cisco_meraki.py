@@ -1,10 +1,115 @@
+import http.cookiejar
+import inspect
 import os
+import random
+import string
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+try:
+    import orjson  # Optional: much faster decoding of large responses
+except ImportError:
+    orjson = None
+
+# Upper bound on in-flight requests for bulk helpers
+MAX_CONCURRENT_REQUESTS = 8
+# Keep-alive connections held per host; larger than the bulk worker count so
+# concurrent requests reuse warm sockets instead of opening throwaway ones
+CONNECTION_POOL_SIZE = 16
+
+# Retry policy for rate limits (429) and transient server/network failures
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these are retried after a 5xx or network error; a 429 is always safe to retry
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+# Client-side cap that keeps bursts under the API's published rate limit
+RATE_LIMIT_PER_SECOND = 9
+
+_json_loads = orjson.loads if orjson else json.loads
+
+def _retry_delay(attempt, response=None):
+    """Seconds to wait before the next retry: Retry-After if given, else jittered exponential backoff"""
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def _get_shared_session():
+    """Module-wide requests session so all client instances share one connection pool.
+
+    Cookies are not kept: the session is shared by clients with different
+    credentials, and a cookie set for one must not be sent with another's requests.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_maxsize=CONNECTION_POOL_SIZE))
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                _shared_session = session
+    return _shared_session
+
+class _RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the next request may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative reserves a future slot for this caller
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class _Endpoint:
+    """Declarative client method built from an HTTP verb and a URL template
+    
+    `get_thing = _Endpoint("GET", "/things/{thing_id}", "doc")` in a class body
+    becomes a real method `get_thing(self, thing_id)` when the class is created;
+    the template placeholders, in order, are its positional arguments.
+    """
+    
+    def __init__(self, verb, template, doc, **request_kwargs):
+        parsed = list(string.Formatter().parse(template))
+        fields = [name for _, name, _, _ in parsed if name]
+        # Positional "{}" form so calls skip building a kwargs dict
+        path = "".join(literal + ("{}" if name else "") for literal, name, _, _ in parsed)
+        signature = inspect.Signature(
+            [inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD) for name in ["self", *fields]])
+        
+        def method(self, *args, **kwargs):
+            if kwargs or len(args) != len(fields):
+                args = signature.bind(self, *args, **kwargs).args[1:]
+            return self._make_request(verb, path.format(*args), **request_kwargs)
+        
+        method.__doc__ = doc
+        method.__signature__ = signature
+        self.method = method
+    
+    def __set_name__(self, owner, name):
+        # Swap in the plain function so calls pay no descriptor overhead
+        self.method.__name__ = name
+        self.method.__qualname__ = f"{owner.__name__}.{name}"
+        setattr(owner, name, self.method)
 
 def format_as_markdown_table(items, headers, key_mapping):
     """Convert list of dictionaries to markdown table format.
@@ -20,137 +125,170 @@ def format_as_markdown_table(items, headers, key_mapping):
     if not items:
         return "No items found."
     
-    # Build header row
-    table = "| " + " | ".join(headers) + " |\n"
-    # Build separator row
-    table += "|" + "|".join(["---"] * len(headers)) + "|\n"
+    keys = [key_mapping.get(header, header.lower()) for header in headers]
+    
+    # Header and separator rows
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join(["---"] * len(headers)) + "|",
+    ]
     
-    # Build data rows
+    # Data rows, collected and joined once rather than concatenated per row
     for idx, item in enumerate(items, 1):
-        row_values = []
-        for header in headers:
-            key = key_mapping.get(header, header.lower())
-            if key == "#":
-                row_values.append(str(idx))
-            else:
-                value = item.get(key, "N/A")
-                row_values.append(str(value))
-        table += "| " + " | ".join(row_values) + " |\n"
-    
-    return table
+        row_values = [str(idx) if key == "#" else str(item.get(key, "N/A")) for key in keys]
+        lines.append("| " + " | ".join(row_values) + " |")
+    
+    return "\n".join(lines) + "\n"
 
 class MerakiClient:
+    # HTTP verbs accepted by _make_request
+    _VERBS = {
+        "GET": requests.Session.get,
+        "POST": requests.Session.post,
+        "PUT": requests.Session.put,
+        "DELETE": requests.Session.delete,
+    }
+    
     def __init__(self, api_key=None):
         """Initialize Meraki API client.
         
         Args:
             api_key: Meraki API key (uses MERAKI_API_KEY env var if not provided)
         """
+        # Only look for a .env file when the key isn't passed in or already exported
+        if not (api_key or os.getenv('MERAKI_API_KEY')):
+            from dotenv import load_dotenv
+            load_dotenv()
+        
         self.api_key = api_key or os.getenv('MERAKI_API_KEY')
         
         if not self.api_key:
             raise ValueError("MERAKI_API_KEY required in .env or as parameter")
         
         self.base_url = "https://api.meraki.com/api/v1"
-        self.session = requests.Session()
         self._setup_headers()
+        self._limiter = _RateLimiter(RATE_LIMIT_PER_SECOND)
+    
+    @property
+    def session(self):
+        """HTTP session shared by every client in this module, opened on first use"""
+        return _get_shared_session()
     
     def _setup_headers(self):
-        """Setup authorization headers"""
-        self.session.headers.update({
+        """Build authorization headers once; they are passed with every request"""
+        self._headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json"
-        })
+        }
+    
+    def _send(self, verb, method, url, **kwargs):
+        """Send a request, retrying rate limits and transient failures with backoff"""
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(MAX_RETRIES + 1):
+            last_attempt = attempt == MAX_RETRIES
+            self._limiter.acquire()
+            try:
+                response = verb(self.session, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt or not idempotent:
+                    raise
+                time.sleep(_retry_delay(attempt))
+                continue
+            
+            status = response.status_code
+            if last_attempt or status not in RETRY_STATUS_CODES or (status != 429 and not idempotent):
+                return response
+            time.sleep(_retry_delay(attempt, response))
     
     def _make_request(self, method, endpoint, data=None, params=None):
         """Make HTTP request to Meraki API"""
         url = f"{self.base_url}{endpoint}"
         
+        method = method.upper()
+        verb = self._VERBS.get(method)
+        if verb is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         try:
-            if method.upper() == "GET":
-                response = self.session.get(url, params=params, timeout=30)
-            elif method.upper() == "POST":
-                response = self.session.post(url, json=data, params=params, timeout=30)
-            elif method.upper() == "PUT":
-                response = self.session.put(url, json=data, params=params, timeout=30)
-            elif method.upper() == "DELETE":
-                response = self.session.delete(url, params=params, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json() if response.text else {"status": "success"}
+            response = self._send(verb, method, url, headers=self._headers, json=data, params=params, timeout=30)
+            if response.status_code >= 400:
+                raise Exception(f"Meraki API request failed: HTTP {response.status_code}: {response.text[:500]}")
+            return _json_loads(response.content) if response.content else {"status": "success"}
         
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             raise Exception(f"Meraki API request failed: {str(e)}")
     
+    def bulk_get(self, endpoints, params=None, max_workers=MAX_CONCURRENT_REQUESTS):
+        """GET several endpoints concurrently.
+        
+        Args:
+            endpoints: List of endpoint paths (e.g., ["/networks/N_1/devices", ...])
+            params: Query parameters applied to every request
+            max_workers: Maximum number of requests in flight at once
+        
+        Returns:
+            List of responses in the same order as endpoints. The first failed
+            request raises, as with the single-request methods.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda ep: self._make_request("GET", ep, params=params), endpoints))
+    
     # =====================================================================
     # Organization Operations
     # =====================================================================
     
-    def list_organizations(self):
-        """List all organizations the API key has access to.
+    list_organizations = _Endpoint("GET", "/organizations", """List all organizations the API key has access to.
         
         Returns:
             List of organizations with id, name, url
-        """
-        return self._make_request("GET", "/organizations")
+        """)
     
-    def get_organization(self, org_id):
-        """Get organization details.
+    get_organization = _Endpoint("GET", "/organizations/{org_id}", """Get organization details.
         
         Args:
             org_id: Organization ID
         
         Returns:
             Organization details
-        """
-        return self._make_request("GET", f"/organizations/{org_id}")
+        """)
     
     # =====================================================================
     # Networks Operations
     # =====================================================================
     
-    def list_networks(self, org_id):
-        """List all networks in an organization.
+    list_networks = _Endpoint("GET", "/organizations/{org_id}/networks", """List all networks in an organization.
         
         Args:
             org_id: Organization ID
         
         Returns:
             List of networks with id, name, type, tags
-        """
-        return self._make_request("GET", f"/organizations/{org_id}/networks")
+        """)
     
-    def get_network(self, network_id):
-        """Get network details.
+    get_network = _Endpoint("GET", "/networks/{network_id}", """Get network details.
         
         Args:
             network_id: Network ID
         
         Returns:
             Network details
-        """
-        return self._make_request("GET", f"/networks/{network_id}")
+        """)
     
     # =====================================================================
     # Device Operations
     # =====================================================================
     
-    def list_devices(self, network_id):
-        """List all devices in a network.
+    list_devices = _Endpoint("GET", "/networks/{network_id}/devices", """List all devices in a network.
         
         Args:
             network_id: Network ID
         
         Returns:
             List of devices with serial, model, name, status
-        """
-        return self._make_request("GET", f"/networks/{network_id}/devices")
+        """)
     
-    def get_device(self, network_id, serial):
-        """Get device details.
+    get_device = _Endpoint("GET", "/networks/{network_id}/devices/{serial}", """Get device details.
         
         Args:
             network_id: Network ID
@@ -158,11 +296,9 @@ class MerakiClient:
         
         Returns:
             Device details
-        """
-        return self._make_request("GET", f"/networks/{network_id}/devices/{serial}")
+        """)
     
-    def get_device_status(self, network_id, serial):
-        """Get device status (online/offline/alerting).
+    get_device_status = _Endpoint("GET", "/networks/{network_id}/devices/{serial}/status", """Get device status (online/offline/alerting).
         
         Args:
             network_id: Network ID
@@ -170,26 +306,22 @@ class MerakiClient:
         
         Returns:
             Device status details
-        """
-        return self._make_request("GET", f"/networks/{network_id}/devices/{serial}/status")
+        """)
     
     # =====================================================================
     # Wireless (SSID) Operations
     # =====================================================================
     
-    def list_ssids(self, network_id):
-        """List all SSIDs in a network.
+    list_ssids = _Endpoint("GET", "/networks/{network_id}/wireless/ssids", """List all SSIDs in a network.
         
         Args:
             network_id: Network ID
         
         Returns:
             List of SSIDs with number, name, enabled, security
-        """
-        return self._make_request("GET", f"/networks/{network_id}/wireless/ssids")
+        """)
     
-    def get_ssid(self, network_id, number):
-        """Get SSID details.
+    get_ssid = _Endpoint("GET", "/networks/{network_id}/wireless/ssids/{number}", """Get SSID details.
         
         Args:
             network_id: Network ID
@@ -197,15 +329,13 @@ class MerakiClient:
         
         Returns:
             SSID configuration
-        """
-        return self._make_request("GET", f"/networks/{network_id}/wireless/ssids/{number}")
+        """)
     
     # =====================================================================
     # Switch Operations
     # =====================================================================
     
-    def list_switch_ports(self, network_id, serial):
-        """List all ports on a switch device.
+    list_switch_ports = _Endpoint("GET", "/networks/{network_id}/devices/{serial}/switch/ports", """List all ports on a switch device.
         
         Args:
             network_id: Network ID
@@ -213,11 +343,9 @@ class MerakiClient:
         
         Returns:
             List of switch ports with status, vlan, name
-        """
-        return self._make_request("GET", f"/networks/{network_id}/devices/{serial}/switch/ports")
+        """)
     
-    def get_switch_port(self, network_id, serial, port_id):
-        """Get switch port details.
+    get_switch_port = _Endpoint("GET", "/networks/{network_id}/devices/{serial}/switch/ports/{port_id}", """Get switch port details.
         
         Args:
             network_id: Network ID
@@ -226,34 +354,29 @@ class MerakiClient:
         
         Returns:
             Switch port details
-        """
-        return self._make_request("GET", f"/networks/{network_id}/devices/{serial}/switch/ports/{port_id}")
+        """)
     
     # =====================================================================
     # Firewall Operations
     # =====================================================================
     
-    def list_firewall_rules(self, network_id):
-        """List firewall rules for a network.
+    list_firewall_rules = _Endpoint("GET", "/networks/{network_id}/firewallRules", """List firewall rules for a network.
         
         Args:
             network_id: Network ID
         
         Returns:
             List of firewall rules with policy, protocol, src/dst
-        """
-        return self._make_request("GET", f"/networks/{network_id}/firewallRules")
+        """)
     
-    def get_firewall_settings(self, network_id):
-        """Get firewall settings.
+    get_firewall_settings = _Endpoint("GET", "/networks/{network_id}/firewallSettings", """Get firewall settings.
         
         Args:
             network_id: Network ID
         
         Returns:
             Firewall configuration
-        """
-        return self._make_request("GET", f"/networks/{network_id}/firewallSettings")
+        """)
     
     # =====================================================================
     # Client Operations
@@ -271,8 +394,7 @@ class MerakiClient:
         """
         return self._make_request("GET", f"/networks/{network_id}/clients", params=params)
     
-    def get_client(self, network_id, client_id):
-        """Get client details.
+    get_client = _Endpoint("GET", "/networks/{network_id}/clients/{client_id}", """Get client details.
         
         Args:
             network_id: Network ID
@@ -280,5 +402,4 @@ class MerakiClient:
         
         Returns:
             Client details with history, usage, devices
-        """
-        return self._make_request("GET", f"/networks/{network_id}/clients/{client_id}")
+        """)
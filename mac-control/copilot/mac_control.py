@@ -5,46 +5,163 @@ Simple mac-control copilot runtime helper.
 Usage:
   python3 mac_control.py --host user@host.example.com --cmd "ls -la" [--local]
 If --local is set, runs osascript on the local machine.
+Repeat --cmd to run several commands; local AppleScript commands then share
+one osascript process instead of spawning one each.
 
 This is a minimal implementation; production setups should use SSH keys and proper credential management.
 """
 
 import argparse
+import os
+import re
+import select
 import subprocess
 import sys
 
+# Reuse one authenticated SSH connection across calls: the first call opens a
+# master socket, later calls within SSH_CONTROL_PERSIST skip the handshake
+SSH_CONTROL_PERSIST = "60s"
+SSH_MUX_OPTIONS = [
+    "-o", "ControlMaster=auto",
+    "-o", "ControlPath=%d/.ssh/cm-%C",
+    "-o", f"ControlPersist={SSH_CONTROL_PERSIST}",
+]
+
+
+class OsaSession:
+    """Long-lived `osascript -i` process for running several AppleScript commands.
+
+    Each command is followed by a sentinel string literal; osascript echoes its
+    value, which marks the end of that command's output. Only single-line
+    commands can be sent, since -i evaluates its input one line at a time.
+    """
+
+    SENTINEL = "__MAC_CONTROL_END__"
+    # ">> " input prompts and the "=> " result prefix that -i puts at the start of a line
+    _PREFIX = re.compile(r"^(?:>> )*(?:=> )?", re.M)
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ["osascript", "-i"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+
+    def run(self, cmd):
+        """Run one AppleScript command and return (output, errors) as text.
+
+        Interactive prompts and the "=> " result prefix are removed from the
+        output. Raises BrokenPipeError if osascript has already exited, in
+        which case nothing was sent.
+        """
+        self.proc.stdin.write(f'{cmd}\n"{self.SENTINEL}"\n'.encode())
+
+        sentinel = self.SENTINEL.encode()
+        out_fd, err_fd = self.proc.stdout.fileno(), self.proc.stderr.fileno()
+        out, err = bytearray(), bytearray()
+        buffers = {out_fd: out, err_fd: err}
+        open_fds = [out_fd, err_fd]
+        # Read both pipes until the sentinel's line has arrived on stdout
+        while True:
+            end = out.find(sentinel)
+            if end != -1 and out.find(b"\n", end) != -1:
+                break
+            if out_fd not in open_fds:
+                # osascript exited mid-command; report whatever it produced as a failure
+                end = None
+                if not err:
+                    err += b"osascript exited before the command finished\n"
+                break
+            ready, _, _ = select.select(open_fds, [], [])
+            for fd in ready:
+                chunk = os.read(fd, 65536)
+                if chunk:
+                    buffers[fd] += chunk
+                else:
+                    open_fds.remove(fd)
+        # Errors are written before the sentinel is echoed, so any still buffered belong to this command
+        while err_fd in open_fds and select.select([err_fd], [], [], 0)[0]:
+            chunk = os.read(err_fd, 65536)
+            if not chunk:
+                break
+            err += chunk
+
+        if end is not None:
+            out = out[:out.rfind(b"\n", 0, end) + 1]
+        return self._PREFIX.sub("", out.decode(errors="replace")), err.decode(errors="replace")
+
+    def close(self):
+        """Stop osascript and return its exit code."""
+        self.proc.stdin.close()
+        return self.proc.wait()
+
 
 def run_ssh(host, cmd):
-    ssh_cmd = ["ssh", host, cmd]
-    proc = subprocess.run(ssh_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.stdout:
-        print(proc.stdout, end="")
-    if proc.stderr:
-        print(proc.stderr, file=sys.stderr, end="")
-    return proc.returncode
+    ssh_cmd = ["ssh", *SSH_MUX_OPTIONS, host, cmd]
+    # Inherit our stdout/stderr so output streams through instead of being buffered
+    return subprocess.run(ssh_cmd).returncode
 
 
 def run_local_applescript(cmd):
     as_cmd = ["osascript", "-e", cmd]
-    proc = subprocess.run(as_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.stdout:
-        print(proc.stdout, end="")
-    if proc.stderr:
-        print(proc.stderr, file=sys.stderr, end="")
-    return proc.returncode
+    # Inherit our stdout/stderr so output streams through instead of being buffered
+    return subprocess.run(as_cmd).returncode
+
+
+def run_local_applescripts(cmds):
+    """Run commands in order through one osascript -i session, stopping at the first failure.
+
+    Multi-line commands go through `osascript -e`, which -i cannot evaluate.
+    """
+    session = None
+    rc = 0
+    try:
+        for cmd in cmds:
+            if "\n" in cmd or "\r" in cmd:
+                rc = run_local_applescript(cmd)
+            else:
+                session = session or OsaSession()
+                try:
+                    output, errors = session.run(cmd)
+                except OSError:
+                    # osascript died after the previous command (a fatal error or a kill) and
+                    # this one was never sent: run it on its own, and start afresh for the next
+                    session.close()
+                    session = None
+                    rc = run_local_applescript(cmd)
+                else:
+                    print(output, end="", flush=True)
+                    if errors:
+                        print(errors, end="", file=sys.stderr, flush=True)
+                        rc = 1
+            if rc:
+                break
+    finally:
+        if session:
+            rc = session.close() or rc
+    return rc
 
 
 def main():
     parser = argparse.ArgumentParser(description="mac-control helper")
     parser.add_argument("--host", help="SSH destination (user@host) or 'local'", required=True)
-    parser.add_argument("--cmd", help="Command or AppleScript to run", required=True)
+    parser.add_argument("--cmd", help="Command or AppleScript to run (repeatable)", required=True, action="append")
     parser.add_argument("--local", action="store_true", help="Run command on local mac via osascript")
     args = parser.parse_args()
 
     if args.local or args.host in ("local", "localhost"):
-        rc = run_local_applescript(args.cmd)
+        if len(args.cmd) == 1:
+            rc = run_local_applescript(args.cmd[0])
+        else:
+            rc = run_local_applescripts(args.cmd)
     else:
-        rc = run_ssh(args.host, args.cmd)
+        rc = 0
+        for cmd in args.cmd:
+            rc = run_ssh(args.host, cmd)
+            if rc:
+                break
     sys.exit(rc)
 
 
@@ -8,10 +8,18 @@ data exfiltration risks, insecure functions, and more.
 
 import os
 import re
+import sys
 import json
+import mmap
 import hashlib
+import functools
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+from operator import attrgetter
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -30,7 +38,7 @@ SEVERITY_ICONS = {
 
 # ─── Finding Dataclass ────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     rule_id: str
     severity: str
@@ -40,6 +48,24 @@ class Finding:
     line: int
     snippet: str = ""
     remediation: str = ""
+    # SEVERITY_ORDER rank of severity, kept in step with it so sorting needs no per-item lookup
+    _rank: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._rank = SEVERITY_ORDER.get(self.severity, 0)
+
+    def to_dict(self) -> dict:
+        """Same dict as dataclasses.asdict, built directly instead of via its recursive deep copy."""
+        return {
+            "rule_id": self.rule_id,
+            "severity": self.severity,
+            "title": self.title,
+            "description": self.description,
+            "file": self.file,
+            "line": self.line,
+            "snippet": self.snippet,
+            "remediation": self.remediation,
+        }
 
 
 # ─── Detection Rules ──────────────────────────────────────────────────────────
@@ -54,6 +80,7 @@ RULES = [
         "description": "A possible API key, token, or secret is hardcoded in source.",
         "remediation": "Move to .env file and load via os.getenv(). Never commit secrets.",
         "file_types": [".py", ".js", ".ts", ".env.example"],
+        "triggers": ["key", "token", "bearer", "pass", "pwd", "akia", "sk-", "ghp_", "xox"],
         "patterns": [
             r'(?i)(api[_-]?key|access[_-]?token|secret[_-]?key|private[_-]?key|auth[_-]?token|bearer)\s*[=:]\s*["\']([A-Za-z0-9+/=._\-]{20,})["\']',
             r'(?i)(password|passwd|pwd)\s*[=:]\s*["\']([^"\']{8,})["\']',
@@ -72,6 +99,7 @@ RULES = [
         "description": "Instruction override pattern detected in skill config or docs. May subvert agent behavior.",
         "remediation": "Remove override instructions. Skills should not attempt to override system prompts.",
         "file_types": [".md", ".txt", ".json", ".yaml", ".yml"],
+        "triggers": ["ignore", "disregard", "now", "restrictions", "pretend", "dan", "jailbreak"],
         "patterns": [
             r'(?i)ignore\s+(all\s+)?(previous|prior|above|earlier)\s+instructions',
             r'(?i)disregard\s+(all\s+)?(previous|prior|system)\s+(instructions|rules|context)',
@@ -91,6 +119,7 @@ RULES = [
         "description": "Use of eval() or exec() with user-controlled input enables code execution.",  # noscan
         "remediation": "Avoid eval/exec. If necessary, use ast.literal_eval() for safe value parsing only.",
         "file_types": [".py", ".js", ".ts"],
+        "triggers": ["eval", "exec", "__import__"],
         "patterns": [
             r'\beval\s*\(',
             r'\bexec\s*\(',
@@ -107,6 +136,7 @@ RULES = [
         "description": "Unvalidated input passed to shell commands enables arbitrary command execution.",
         "remediation": "Use subprocess with a list (not shell=True). Never pass user input directly to shell.",
         "file_types": [".py", ".js", ".ts", ".sh"],
+        "triggers": ["os.system", "subprocess.", "child_process.exec", "execsync"],
         "patterns": [
             r'os\.system\s*\(',
             r'subprocess\.(call|run|Popen)\s*\([^)]*shell\s*=\s*True',
@@ -124,6 +154,7 @@ RULES = [
         "description": "Environment variables or sensitive file contents sent in network requests.",
         "remediation": "Verify all external calls are to documented/approved endpoints. Review what data is being sent.",
         "file_types": [".py", ".js", ".ts"],
+        "triggers": ["requests.", "fetch", "axios."],
         "patterns": [
             r'requests\.(get|post|put)\s*\(.*os\.environ',
             r'requests\.(get|post|put)\s*\(.*open\s*\(.*\.env',
@@ -140,6 +171,7 @@ RULES = [
         "description": "Skill attempts to read sensitive files like SSH keys or system credential files.",  # noscan
         "remediation": "Only access files explicitly needed. Document any legitimate file access in skill README.",
         "file_types": [".py", ".js", ".ts", ".sh"],
+        "triggers": ["ssh/", "aws/credentials", "etc/passwd", "etc/shadow", ".env"],
         "patterns": [
             r'["\']~/.ssh/',
             r'["\']~/.aws/credentials',
@@ -158,6 +190,7 @@ RULES = [
         "description": "Use of pickle.loads or yaml.load without SafeLoader can execute arbitrary code.",
         "remediation": "Use json.loads for data interchange. If YAML needed, use yaml.safe_load().",
         "file_types": [".py"],
+        "triggers": ["pickle.load", "yaml.load", "marshal.load"],
         "patterns": [
             r'pickle\.loads?\s*\(',
             r'yaml\.load\s*\([^)]+(?!Loader\s*=\s*yaml\.SafeLoader)',
@@ -173,6 +206,7 @@ RULES = [
         "description": "Base64-decoded or hex-decoded string executed at runtime suggests hidden malicious code.",
         "remediation": "Never execute decoded strings. Review all base64/hex decoding followed by exec/eval.",
         "file_types": [".py", ".js", ".ts"],
+        "triggers": ["base64.b64decode", "bytes.fromhex", "atob"],
         "patterns": [
             r'base64\.b64decode\s*\(.*\)\s*.*exec',
             r'base64\.b64decode\s*\(.*\)\s*.*eval',
@@ -189,6 +223,7 @@ RULES = [
         "description": "Skill requests permissions beyond its stated purpose.",
         "remediation": "Follow principle of least privilege. Only request permissions the skill genuinely needs.",
         "file_types": [".json", ".yaml", ".yml"],
+        "triggers": ["permissions", "requires"],
         "patterns": [
             r'(?i)"permissions"\s*:.*"(admin|root|sudo|superuser|god_mode)',
             r'(?i)permissions.*all_access',
@@ -196,6 +231,17 @@ RULES = [
         ]
     },
 
+    # ── HIGH: Files Not Scanned ───────────────────────────────────────────────
+    {
+        "id": "file-not-scanned",
+        "severity": "high",
+        "title": "File skipped by scanner",
+        "description": "File has a scannable extension but is larger than the scan size limit or could not be read, so it was not checked.",
+        "remediation": "Review the file manually, or remove generated bundles and oversized files from the skill.",
+        "file_types": [],  # any scannable file
+        "patterns": [],  # handled specially in _scan_file()
+    },
+
     # ── MEDIUM: Missing Input Validation ─────────────────────────────────────
     {
         "id": "missing-input-validation",
@@ -204,6 +250,7 @@ RULES = [
         "description": "User-supplied input may be passed directly to dangerous sinks.",
         "remediation": "Validate and sanitize all external input before use in commands, queries, or file paths.",
         "file_types": [".py", ".js", ".ts"],
+        "triggers": ["input("],
         "patterns": [
             r'os\.path\.join\s*\([^)]*input\(',
             r'open\s*\([^)]*input\(',
@@ -219,6 +266,7 @@ RULES = [
         "description": "Network request to an external host not mentioned in skill documentation.",
         "remediation": "Document all external hosts in README. Use allowlisting to restrict outbound calls.",
         "file_types": [".py", ".js", ".ts"],
+        "triggers": ["requests.", "fetch"],
         "patterns": [
             r'requests\.(get|post)\s*\(["\']https?://(?!api\.(cisco|openai|anthropic|github|google|microsoft|aws|azure))',
             r'fetch\s*\(["\']https?://(?!api\.(cisco|openai|anthropic|github|google|microsoft|aws|azure))',
@@ -233,6 +281,7 @@ RULES = [
         "description": "Hardcoded test credentials, debug flags, or artifacts left in production code.",  # noscan
         "remediation": "Remove all debug code, test credentials, and artifacts before shipping.",
         "file_types": [".py", ".js", ".ts", ".json"],
+        "triggers": ["pass", "pwd", "backdoor", "debug", "todo", "fixme"],
         "patterns": [
             r'(?i)(admin|test|debug)[_-]?(password|pass|pwd)\s*[=:]\s*["\'][^"\']+["\']',
             r'(?i)(?<!["\'\w])backdoor(?!["\'\w-])',  # noscan - word-boundary match only
@@ -250,6 +299,7 @@ RULES = [
         "description": "Logging calls that may include tokens, keys, or user data.",
         "remediation": "Mask or exclude sensitive values from log output.",
         "file_types": [".py", ".js", ".ts"],
+        "triggers": ["token", "password", "secret"],
         "patterns": [
             r'(?i)(print|logging\.(debug|info|warning|error)|console\.(log|warn|error))\s*\(.*token',
             r'(?i)(print|logging\.(debug|info|warning|error)|console\.(log|warn|error))\s*\(.*password',
@@ -269,21 +319,110 @@ RULES = [
     },
 ]
 
+# Compile every pattern once at import; _scan_file reuses the compiled objects
+for _rule in RULES:
+    _rule["compiled"] = [re.compile(p) for p in _rule["patterns"]]
+
+RULES_BY_ID = {rule["id"]: rule for rule in RULES}
+_FILE_NOT_SCANNED = RULES_BY_ID["file-not-scanned"]
+
+# Skills with at least this many files are scanned in a process pool
+PARALLEL_MIN_FILES = 32
+
 # Extensions to scan
 SCANNABLE_EXTENSIONS = {".py", ".js", ".ts", ".sh", ".md", ".txt", ".json", ".yaml", ".yml"}
 # Extensions that are not text/code (skip)
 BINARY_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".ico", ".woff", ".woff2", ".ttf", ".eot", ".bin", ".zip"}
+# Files larger than this are reported as skipped rather than scanned
+MAX_FILE_SIZE = 16 * 1024 * 1024
+# Files at least this large are decoded straight from an mmap and not kept in the read cache
+LARGE_FILE_SIZE = 1024 * 1024
+# Inline markers that suppress findings on their line
+_SUPPRESS_MARKER = re.compile("noscan|nosec")
+# Characters that (?i) matches against an ASCII letter but that str.lower() does not map to it
+_TRIGGER_FOLD = (("\u0130", "i"), ("\u0131", "i"), ("\u017f", "s"))
+
+
+# ─── File Loading ─────────────────────────────────────────────────────────────
+
+def _read_and_index(path: str, size: int) -> Optional[tuple[str, tuple[str, ...], array, frozenset]]:
+    """Read a file once and return (content, lines, line start offsets, suppressed line
+    numbers), or None if it is over MAX_FILE_SIZE.
+
+    NUL bytes and invalid UTF-8 do not stop a scan: non-text extensions are
+    filtered out before this, and a stray NUL must not hide the rest of a file.
+    """
+    if size > MAX_FILE_SIZE:
+        return None
+    with open(path, "rb") as f:
+        if size >= LARGE_FILE_SIZE:
+            # Decode from the mapping so no intermediate bytes copy of the file is made
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, "utf-8", "replace")
+        else:
+            content = f.read().decode("utf-8", errors="replace")
+    lines = tuple(content.splitlines())
+    # Offset where each line starts, so a match position maps back to its line number;
+    # a packed int array is a fraction of the size of a list of int objects
+    line_starts = array("i", accumulate(map(len, content.splitlines(keepends=True)), initial=0))
+    # Lines carrying a noscan/nosec marker, found in one pass over the buffer
+    suppressed = frozenset(bisect_right(line_starts, m.start()) for m in _SUPPRESS_MARKER.finditer(content))
+    return content, lines, line_starts, suppressed
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_and_index_cached(path: str, mtime_ns: int, size: int) -> Optional[tuple[str, tuple[str, ...], array, frozenset]]:
+    """_read_and_index for files under LARGE_FILE_SIZE.
+
+    Keyed on mtime and size as well as path, so an edited file is re-read
+    while repeated scans of an unchanged tree reuse the decoded text.
+    """
+    return _read_and_index(path, size)
+
+
+def _trigger_text(content: str) -> str:
+    """Lowercase content for matching rule triggers, folded so that any text a
+    case-insensitive pattern can match still contains the pattern's trigger."""
+    if not content.isascii():
+        for char, letter in _TRIGGER_FOLD:
+            if char in content:
+                content = content.replace(char, letter)
+    return content.lower()
+
+
+# ─── Worker Processes ─────────────────────────────────────────────────────────
+
+_worker_scanner = None
+
+
+def _init_worker(scanner: "SkillSecurityScanner") -> None:
+    """Process pool initializer: keep one scanner per worker instead of pickling it per file."""
+    global _worker_scanner
+    _worker_scanner = scanner
+
+
+def _scan_file_worker(file_path: Path, base: Path) -> list[Finding]:
+    return _worker_scanner._scan_file(file_path, base)
 
 
 # ─── Scanner Class ────────────────────────────────────────────────────────────
 
 class SkillSecurityScanner:
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, jobs: Optional[int] = None):
         self.config = self._load_config(config_path)
         self.disabled_rules = set(self.config.get("disable_rules", []))
         self.severity_overrides = self.config.get("severity_overrides", {})
         self.scan_extensions = set(self.config.get("scan_extensions", list(SCANNABLE_EXTENSIONS)))
+        # Worker processes for large skills; 1 keeps everything in-process
+        self.jobs = jobs or self.config.get("jobs") or os.cpu_count() or 1
+        # Enabled pattern rules per extension, so _scan_file only visits rules that apply
+        self.rules_by_ext = {}
+        for rule in RULES:
+            if rule["id"] in self.disabled_rules or not rule.get("patterns"):
+                continue
+            for ext in rule.get("file_types", SCANNABLE_EXTENSIONS):
+                self.rules_by_ext.setdefault(ext, []).append(rule)
 
     def _load_config(self, config_path: Optional[str]) -> dict:
         if config_path and Path(config_path).exists():
@@ -296,8 +435,12 @@ class SkillSecurityScanner:
                 return json.load(f)
         return {}
 
-    def scan_skill(self, skill_path: str) -> dict:
-        """Scan a skill directory and return structured results."""
+    def scan_skill(self, skill_path: str, min_severity: str = "info") -> dict:
+        """Scan a skill directory and return structured results.
+
+        Only findings at or above min_severity are included in "findings";
+        "counts" and "passed" always cover every finding.
+        """
         path = Path(skill_path).expanduser().resolve()
         if not path.exists():
             return {"error": f"Path not found: {skill_path}"}
@@ -307,11 +450,9 @@ class SkillSecurityScanner:
 
         if path.is_dir():
             findings += self._scan_skill_structure(path)
-            for fp in sorted(path.rglob("*")):
-                if fp.is_file() and fp.suffix in self.scan_extensions and fp.suffix not in BINARY_EXTENSIONS:
-                    file_findings = self._scan_file(fp, base=path)
-                    findings += file_findings
-                    files_scanned.append(str(fp.relative_to(path)))
+            files = self._collect_files(path)
+            findings += self._scan_files(files, base=path)
+            files_scanned = [str(fp.relative_to(path)) for fp in files]
         else:
             file_findings = self._scan_file(path, base=path.parent)
             findings += file_findings
@@ -321,63 +462,139 @@ class SkillSecurityScanner:
         for f in findings:
             if f.rule_id in self.severity_overrides:
                 f.severity = self.severity_overrides[f.rule_id]
+                f._rank = SEVERITY_ORDER.get(f.severity, 0)
 
         # Sort by severity descending
-        findings.sort(key=lambda f: SEVERITY_ORDER.get(f.severity, 0), reverse=True)
+        findings.sort(key=attrgetter("_rank"), reverse=True)
+
+        counts = dict.fromkeys(["critical", "high", "medium", "low", "info"], 0)
+        for f in findings:
+            if f.severity in counts:
+                counts[f.severity] += 1
 
-        counts = {s: sum(1 for f in findings if f.severity == s)
-                  for s in ["critical", "high", "medium", "low", "info"]}
+        # Drop findings below the threshold before converting them to dicts
+        threshold = SEVERITY_ORDER.get(min_severity, 0)
+        if threshold:
+            findings = [f for f in findings if f._rank >= threshold]
 
         return {
             "skill_path": str(path),
             "skill_name": path.name,
             "files_scanned": files_scanned,
             "total_files": len(files_scanned),
-            "findings": [asdict(f) for f in findings],
+            "findings": [f.to_dict() for f in findings],
             "counts": counts,
             "passed": counts["critical"] == 0 and counts["high"] == 0,
         }
 
+    def _collect_files(self, root: Path) -> list[Path]:
+        """Find scannable files under root with os.scandir, in sorted(root.rglob("*")) order.
+
+        Like rglob, symlinked files are included but symlinked directories are not descended into.
+        """
+        found = []
+        stack = [str(root)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    # Same rule as Path.suffix
+                    dot = entry.name.rfind(".")
+                    ext = entry.name[dot:] if 0 < dot < len(entry.name) - 1 else ""
+                    if ext in self.scan_extensions and ext not in BINARY_EXTENSIONS and entry.is_file():
+                        found.append(entry.path)
+        # Path ordering compares component by component, not as flat strings
+        found.sort(key=lambda p: os.path.normcase(p).split(os.sep))
+        return [Path(p) for p in found]
+
+    def _scan_files(self, files: list[Path], base: Path) -> list[Finding]:
+        """Scan files in order, spreading large batches across worker processes."""
+        if self.jobs > 1 and len(files) >= PARALLEL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                     initargs=(self,)) as pool:
+                chunksize = max(1, len(files) // (self.jobs * 4))
+                per_file = list(pool.map(_scan_file_worker, files, repeat(base), chunksize=chunksize))
+        else:
+            per_file = [self._scan_file(fp, base) for fp in files]
+        return [f for file_findings in per_file for f in file_findings]
+
     def _scan_file(self, file_path: Path, base: Path) -> list[Finding]:
         findings = []
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="replace")
-        except Exception:
+        ext = file_path.suffix.lower()
+        rules = self.rules_by_ext.get(ext)
+        if not rules:
             return findings
+        try:
+            st = file_path.stat()
+            if st.st_size >= LARGE_FILE_SIZE:
+                loaded = _read_and_index(str(file_path), st.st_size)
+            else:
+                loaded = _read_and_index_cached(str(file_path), st.st_mtime_ns, st.st_size)
+            skipped = "(over size limit)"
+        except (OSError, ValueError):
+            loaded = None
+            skipped = "(unreadable)"
 
-        lines = content.splitlines()
         rel_path = str(file_path.relative_to(base))
-        ext = file_path.suffix.lower()
-
-        for rule in RULES:
-            if rule["id"] in self.disabled_rules:
-                continue
-            if not rule.get("patterns"):
-                continue
-            if ext not in rule.get("file_types", SCANNABLE_EXTENSIONS):
+        # A file that could not be checked fails the scan rather than passing unseen
+        if loaded is None:
+            if "file-not-scanned" not in self.disabled_rules:
+                rule = _FILE_NOT_SCANNED
+                findings.append(Finding(
+                    rule_id=rule["id"],
+                    severity=rule["severity"],
+                    title=rule["title"],
+                    description=rule["description"],
+                    file=rel_path,
+                    line=0,
+                    snippet=skipped,
+                    remediation=rule["remediation"],
+                ))
+            return findings
+        content, lines, line_starts, suppressed = loaded
+        is_example = "example" in file_path.name.lower()
+        trigger_text = _trigger_text(content)
+
+        for rule in rules:
+            # Every pattern of a rule contains one of its triggers, so a file
+            # with none of them cannot match and its regexes are skipped
+            triggers = rule.get("triggers")
+            if triggers and not any(t in trigger_text for t in triggers):
                 continue
-
-            for pattern in rule["patterns"]:
-                for lineno, line in enumerate(lines, start=1):
-                    if re.search(pattern, line):
-                        # Skip noscan-suppressed lines
-                        if "noscan" in line or "nosec" in line:
-                            continue
-                        # Skip obvious .env.example / placeholder lines
-                        if "example" in file_path.name.lower() and "your_" in line.lower():
-                            continue
-                        snippet = line.strip()[:120]
-                        findings.append(Finding(
-                            rule_id=rule["id"],
-                            severity=rule["severity"],
-                            title=rule["title"],
-                            description=rule["description"],
-                            file=rel_path,
-                            line=lineno,
-                            snippet=snippet,
-                            remediation=rule["remediation"],
-                        ))
-                        break  # One finding per rule per file (avoid spam)
+            for pattern in rule["compiled"]:
+                # Search the whole buffer, then confirm on the line itself so a match
+                # spanning a newline (e.g. via \s*) is not reported
+                pos = 0
+                while match := pattern.search(content, pos):
+                    lineno = bisect_right(line_starts, match.start())
+                    pos = line_starts[lineno]
+                    # Skip noscan-suppressed lines
+                    if lineno in suppressed:
+                        continue
+                    line = lines[lineno - 1]
+                    if not pattern.search(line):
+                        continue
+                    # Skip obvious .env.example / placeholder lines
+                    if is_example and "your_" in line.lower():
+                        continue
+                    snippet = line.strip()[:120]
+                    findings.append(Finding(
+                        rule_id=rule["id"],
+                        severity=rule["severity"],
+                        title=rule["title"],
+                        description=rule["description"],
+                        file=rel_path,
+                        line=lineno,
+                        snippet=snippet,
+                        remediation=rule["remediation"],
+                    ))
+                    break  # One finding per rule per file (avoid spam)
 
         return findings
 
@@ -420,53 +637,48 @@ class SkillSecurityScanner:
         results = []
         for item in sorted(base.iterdir()):
             if item.is_dir() and not item.name.startswith("."):
-                result = self.scan_skill(str(item))
+                result = self.scan_skill(str(item), min_severity=min_severity)
                 if "error" not in result:
-                    # Filter by min severity
-                    threshold = SEVERITY_ORDER.get(min_severity, 0)
-                    result["findings"] = [
-                        f for f in result["findings"]
-                        if SEVERITY_ORDER.get(f["severity"], 0) >= threshold
-                    ]
                     results.append(result)
         return results
 
-    def print_report(self, result: dict, min_severity: str = "low") -> None:
-        """Print a human-readable security report."""
+    def print_report(self, result: dict, min_severity: str = "low", out=None) -> None:
+        """Print a human-readable security report to out (default: sys.stdout)."""
+        out = out or sys.stdout
         if "error" in result:
-            print(f"❌ Error: {result['error']}")
+            print(f"❌ Error: {result['error']}", file=out)
             return
 
         threshold = SEVERITY_ORDER.get(min_severity, 0)
         filtered = [f for f in result["findings"] if SEVERITY_ORDER.get(f["severity"], 0) >= threshold]
 
-        print(f"\n{'=' * 70}")
-        print(f"🔍 Skill Security Scan Report")
-        print(f"{'=' * 70}")
-        print(f"Skill:    {result['skill_name']}")
-        print(f"Path:     {result['skill_path']}")
-        print(f"Files:    {result['total_files']} scanned")
-        print(f"{'─' * 70}")
+        print(f"\n{'=' * 70}", file=out)
+        print(f"🔍 Skill Security Scan Report", file=out)
+        print(f"{'=' * 70}", file=out)
+        print(f"Skill:    {result['skill_name']}", file=out)
+        print(f"Path:     {result['skill_path']}", file=out)
+        print(f"Files:    {result['total_files']} scanned", file=out)
+        print(f"{'─' * 70}", file=out)
 
         if not filtered:
-            print("✅ No findings at or above the selected severity threshold.\n")
+            print("✅ No findings at or above the selected severity threshold.\n", file=out)
         else:
             for f in filtered:
                 icon = SEVERITY_ICONS.get(f["severity"], f["severity"].upper())
-                print(f"\n{icon}  [{f['rule_id']}]  {f['file']}:{f['line']}")
-                print(f"   {f['title']}")
+                print(f"\n{icon}  [{f['rule_id']}]  {f['file']}:{f['line']}", file=out)
+                print(f"   {f['title']}", file=out)
                 if f["snippet"]:
-                    print(f"   Code: {f['snippet']}")
-                print(f"   Fix:  {f['remediation']}")
+                    print(f"   Code: {f['snippet']}", file=out)
+                print(f"   Fix:  {f['remediation']}", file=out)
 
         c = result["counts"]
-        print(f"\n{'─' * 70}")
-        print(f"Summary: {c['critical']} critical, {c['high']} high, {c['medium']} medium, {c['low']} low, {c['info']} info")
+        print(f"\n{'─' * 70}", file=out)
+        print(f"Summary: {c['critical']} critical, {c['high']} high, {c['medium']} medium, {c['low']} low, {c['info']} info", file=out)
 
         if result["passed"]:
-            print("Status:  ✅ PASSED (no critical or high findings)\n")
+            print("Status:  ✅ PASSED (no critical or high findings)\n", file=out)
         else:
-            print("Status:  ❌ FAILED (critical or high findings present)\n")
+            print("Status:  ❌ FAILED (critical or high findings present)\n", file=out)
 
     def to_sarif(self, result: dict) -> dict:
         """Convert findings to SARIF 2.1.0 format for GitHub Advanced Security."""
@@ -12,6 +12,7 @@ Usage:
 """
 
 import argparse
+import io
 import json
 import sys
 import os
@@ -21,6 +22,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from copilot.skill_scanner import SkillSecurityScanner, RULES, SEVERITY_ICONS
 
 
+def write_output(out, fmt, data):
+    """Write a text report as-is, or stream JSON/SARIF data through json.dump."""
+    if fmt == "text":
+        out.write(data)
+    else:
+        json.dump(data, out, indent=2)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Scan AI agent skills for security vulnerabilities",
@@ -36,12 +45,14 @@ def main():
                         help="Output format (default: text)")
     parser.add_argument("--output", help="Save output to file instead of stdout")
     parser.add_argument("--config", help="Path to scanner_config.json")
+    parser.add_argument("--jobs", type=int,
+                        help="Worker processes for large skills (default: CPU count, 1 disables)")
     parser.add_argument("--list-rules", action="store_true", help="List all available detection rules")
     parser.add_argument("--exit-zero", action="store_true",
                         help="Always exit with code 0 (don't fail CI on findings)")
     args = parser.parse_args()
 
-    scanner = SkillSecurityScanner(config_path=args.config)
+    scanner = SkillSecurityScanner(config_path=args.config, jobs=args.jobs)
 
     # ── List rules ─────────────────────────────────────────────────────────────
     if args.list_rules:
@@ -67,23 +78,18 @@ def main():
             exit_code = 1
 
         if args.format == "text":
-            output = ""
+            buf = io.StringIO()
             for result in all_results:
-                import io
-                from contextlib import redirect_stdout
-                buf = io.StringIO()
-                with redirect_stdout(buf):
-                    scanner.print_report(result, min_severity=args.severity)
-                output += buf.getvalue()
-            summary = f"\n{'=' * 70}\n📊 Overall: {sum(1 for r in all_results if r['passed'])}/{len(all_results)} skills passed\n"
-            output += summary
+                scanner.print_report(result, min_severity=args.severity, out=buf)
+            buf.write(f"\n{'=' * 70}\n📊 Overall: {sum(1 for r in all_results if r['passed'])}/{len(all_results)} skills passed\n")
+            output = buf.getvalue()
         elif args.format == "json":
-            output = json.dumps(all_results, indent=2)
+            output = all_results
         else:
-            output = json.dumps({"scans": [scanner.to_sarif(r) for r in all_results]}, indent=2)
+            output = {"scans": [scanner.to_sarif(r) for r in all_results]}
 
     else:
-        result = scanner.scan_skill(args.path)
+        result = scanner.scan_skill(args.path, min_severity=args.severity)
         if "error" in result:
             print(f"❌ {result['error']}", file=sys.stderr)
             sys.exit(1)
@@ -91,31 +97,25 @@ def main():
         if not result["passed"]:
             exit_code = 1
 
-        # Filter by severity for reporting
-        from copilot.skill_scanner import SEVERITY_ORDER
-        threshold = SEVERITY_ORDER.get(args.severity, 0)
-        result["findings"] = [f for f in result["findings"]
-                               if SEVERITY_ORDER.get(f["severity"], 0) >= threshold]
-
         if args.format == "text":
-            import io
-            from contextlib import redirect_stdout
             buf = io.StringIO()
-            with redirect_stdout(buf):
-                scanner.print_report(result, min_severity=args.severity)
+            scanner.print_report(result, min_severity=args.severity, out=buf)
             output = buf.getvalue()
         elif args.format == "json":
-            output = json.dumps(result, indent=2)
+            output = result
         else:  # sarif
-            output = json.dumps(scanner.to_sarif(result), indent=2)
+            output = scanner.to_sarif(result)
 
     # ── Output ─────────────────────────────────────────────────────────────────
+    # JSON and SARIF are encoded straight into the destination in chunks, so the
+    # full document never has to exist as one string
     if args.output:
         with open(args.output, "w") as f:
-            f.write(output)
+            write_output(f, args.format, output)
         print(f"✅ Results saved to: {args.output}")
     else:
-        print(output)
+        write_output(sys.stdout, args.format, output)
+        sys.stdout.write("\n")
 
     if not args.exit_zero:
         sys.exit(exit_code)
@@ -1,5 +1,15 @@
 #!/usr/bin/env python3
-"""Task scheduler CLI for Copilot."""
+"""Task scheduler CLI for Copilot.
+
+Usage:
+    task_scheduler_cli.py <action> [args...]
+    task_scheduler_cli.py --batch < commands.jsonl
+
+Batch mode reads one JSON command per line, e.g.
+{"action": "pause_job", "args": ["job_123"]} or
+{"action": "schedule_task", "args": {"name": "...", "schedule": "...", ...}},
+and prints one JSON result per line, all within a single process.
+"""
 
 import sys
 import json
@@ -8,6 +18,41 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from shared_infrastructure import TaskScheduler
 
+# action -> (TaskScheduler method, number of positional arguments taken from argv)
+COMMANDS = {
+    "schedule_task": (TaskScheduler.schedule_task, 5),
+    "list_jobs": (TaskScheduler.list_jobs, 0),
+    "pause_job": (TaskScheduler.pause_job, 1),
+    "resume_job": (TaskScheduler.resume_job, 1),
+    "delete_job": (TaskScheduler.delete_job, 1),
+    "get_logs": (TaskScheduler.get_logs, 1),
+    "doctor": (TaskScheduler.doctor, 0),
+}
+
+def dispatch(scheduler, action, args):
+    """Run one action with a list of positional args or a dict of keyword args."""
+    if action not in COMMANDS:
+        return {"success": False, "message": f"Unknown action: {action}"}
+    
+    method, argc = COMMANDS[action]
+    if isinstance(args, dict):
+        return method(scheduler, **args)
+    if len(args) < argc:
+        return {"success": False, "message": f"{action} requires {argc} argument(s)"}
+    return method(scheduler, *args[:argc])
+
+def run_batch(scheduler):
+    """Execute JSON commands from stdin, one per line, printing a result line for each."""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            command = json.loads(line)
+            result = dispatch(scheduler, command["action"], command.get("args", []))
+        except Exception as e:
+            result = {"success": False, "message": str(e)}
+        print(json.dumps(result), flush=True)
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({"success": False, "message": "Action required"}))
@@ -16,40 +61,12 @@ def main():
     action = sys.argv[1]
     scheduler = TaskScheduler()
     
+    if action == "--batch":
+        run_batch(scheduler)
+        return
+    
     try:
-        if action == "schedule_task":
-            name = sys.argv[2]
-            schedule = sys.argv[3]
-            agent = sys.argv[4]
-            runtime = sys.argv[5]
-            task = sys.argv[6]
-            result = scheduler.schedule_task(name, schedule, agent, runtime, task)
-        
-        elif action == "list_jobs":
-            result = scheduler.list_jobs()
-        
-        elif action == "pause_job":
-            job_id = sys.argv[2]
-            result = scheduler.pause_job(job_id)
-        
-        elif action == "resume_job":
-            job_id = sys.argv[2]
-            result = scheduler.resume_job(job_id)
-        
-        elif action == "delete_job":
-            job_id = sys.argv[2]
-            result = scheduler.delete_job(job_id)
-        
-        elif action == "get_logs":
-            job_id = sys.argv[2]
-            result = scheduler.get_logs(job_id)
-        
-        elif action == "doctor":
-            result = scheduler.doctor()
-        
-        else:
-            result = {"success": False, "message": f"Unknown action: {action}"}
-        
+        result = dispatch(scheduler, action, sys.argv[2:])
         print(json.dumps(result))
     
     except Exception as e:
@@ -1,23 +1,38 @@
 """
 Simplified task scheduler executor daemon.
 
-Runs as a systemd service, checking jobs.json every 1 second.
+Runs as a systemd service, sleeping until the next job is due or jobs.json is edited.
 For each job that's ready to run:
-- Executes via agent_manager.py
+- Executes via agent_manager.py on a worker thread, so slow jobs do not hold up others
 - Captures results
 - Sends notification to the job creator via their original channel (Telegram or WebEx)
 """
 
+import ctypes
+import ctypes.util
+import functools
+import heapq
 import json
 import os
+import re
+import select
+import struct
 import subprocess
 import sys
+import threading
 import time
 import logging
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Optional
 
+try:
+    import orjson  # Optional: faster jobs.json and results encoding/decoding
+except ImportError:
+    orjson = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +57,125 @@ try:
 except ImportError:
     _WebEXConnector = None
 
+# Longest the main loop sleeps between checks when no job is due sooner
+MAX_IDLE_WAIT = 60
+
+# Notifications for the same recipient within this many seconds are sent as one message
+NOTIFY_DEBOUNCE = 0.2
+# Bundled notifications are split to stay under Telegram's 4096-character message limit
+NOTIFY_MAX_CHARS = 3500
+NOTIFY_SEPARATOR = "\n\n---\n\n"
+
+# "in 5 minutes" / "every 2 hours": prefix, amount, unit (trailing words are ignored)
+_SCHEDULE_RE = re.compile(r"(in|every) \s*(\S+)\s+(\S+)")
+# timedelta keyword for each unit a schedule prefix accepts; "every" has no seconds
+_SCHEDULE_UNITS = {
+    "in": {"second": "seconds", "minute": "minutes", "hour": "hours", "day": "days"},
+    "every": {"minute": "minutes", "hour": "hours", "day": "days"},
+}
+
+# Most results/*.jsonl files ResultAppender keeps open at once
+MAX_OPEN_RESULT_FILES = 256
+
+# inotify event masks (see <sys/inotify.h>)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class JobsFileWatcher:
+    """Block until jobs.json is written, using inotify where available.
+
+    Watches the parent directory rather than the file, so the watch survives
+    jobs.json being replaced by a rename. Without inotify, wait() degrades to
+    a one-second sleep and callers rely on the file's mtime to spot changes.
+    """
+
+    def __init__(self, jobs_file: Path):
+        self.name = os.fsencode(jobs_file.name)
+        self.fd = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, os.fsencode(jobs_file.parent), _IN_CLOSE_WRITE | _IN_MOVED_TO) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, "inotify_add_watch failed")
+            self.fd = fd
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable, polling {jobs_file} every second: {e}")
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds. Returns True if a write to jobs.json was seen."""
+        if self.fd is None:
+            time.sleep(min(timeout, 1))
+            return False
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+
+        # Drain every queued event; only writes to jobs.json itself count
+        changed = False
+        while True:
+            try:
+                buf = os.read(self.fd, 4096)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                _, _, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+                offset += _INOTIFY_EVENT.size
+                if buf[offset:offset + length].rstrip(b"\0") == self.name:
+                    changed = True
+                offset += length
+        return changed
+
+
+@functools.lru_cache(maxsize=256)
+def _schedule_interval(schedule: str) -> Optional[timedelta]:
+    """Parse "in N units" / "every N units" into a timedelta, or None if unsupported."""
+    m = _SCHEDULE_RE.match(schedule.lower().strip())
+    if not m:
+        return None
+    prefix, amount, unit = m.groups()
+    kw = _SCHEDULE_UNITS[prefix].get(unit.rstrip("s"))
+    if not kw:
+        return None
+    try:
+        return timedelta(**{kw: int(amount)})
+    except (ValueError, OverflowError):
+        return None
+
+
+class ResultAppender:
+    """Append to per-job results files through cached O_APPEND descriptors.
+
+    Each append is a single os.writev, so a record and its newline land in one
+    write without being joined first. Descriptors beyond MAX_OPEN_RESULT_FILES
+    are closed least recently used first, and a file deleted while open is reopened.
+    """
+
+    def __init__(self, max_open: int = MAX_OPEN_RESULT_FILES):
+        self.max_open = max_open
+        self._fds: "OrderedDict[Path, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, path: Path, *chunks: bytes):
+        with self._lock:
+            fd = self._fds.pop(path, None)
+            if fd is not None and os.fstat(fd).st_nlink == 0:
+                os.close(fd)
+                fd = None
+            if fd is None:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o666)
+            self._fds[path] = fd
+            while len(self._fds) > self.max_open:
+                os.close(self._fds.popitem(last=False)[1])
+            os.writev(fd, chunks)
+
 
 class TaskSchedulerExecutor:
     """Execute scheduled jobs from jobs.json."""
@@ -55,22 +189,63 @@ class TaskSchedulerExecutor:
         self.jobs_file.parent.mkdir(parents=True, exist_ok=True)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         self.results_dir.mkdir(parents=True, exist_ok=True)
+        self._results = ResultAppender()
+
+        self._watcher = JobsFileWatcher(self.jobs_file)
+        # (st_mtime_ns, st_size, parsed jobs) from the last read or write of jobs.json
+        self._jobs_cache: Optional[tuple[int, int, Dict]] = None
+        # Pending jobs ordered by next_run, and the jobs data it was built from
+        self._heap: list = []
+        self._heap_source: Optional[Dict] = None
+
+        # Ready jobs run concurrently; _jobs_lock serializes jobs.json updates and _running
+        self._pool = ThreadPoolExecutor(max_workers=int(os.getenv("SCHEDULER_POOL_SIZE", "8")))
+        self._jobs_lock = threading.Lock()
+        self._running: set = set()
+
+        # config path -> (config st_mtime_ns, connector), so notifications reuse one client
+        self._connectors: Dict[Path, tuple] = {}
+        self._connectors_lock = threading.Lock()
+
+        # (channel, identity) -> [(job_id, message)] waiting for the debounce timer
+        self._notify_queues: Dict[tuple, list] = {}
+        self._notify_lock = threading.Lock()
 
     def _load_jobs(self) -> Dict:
-        """Load jobs from JSON."""
-        if not self.jobs_file.exists():
+        """Load jobs from JSON, reusing the last parse while the file's mtime and size are unchanged.
+
+        The cached dict is returned as is: callers that modify it must save it
+        with _save_jobs, which keeps the cache in step with the file.
+        """
+        try:
+            st = self.jobs_file.stat()
+        except FileNotFoundError:
             return {"jobs": []}
+        if self._jobs_cache and self._jobs_cache[:2] == (st.st_mtime_ns, st.st_size):
+            return self._jobs_cache[2]
         try:
-            return json.loads(self.jobs_file.read_text())
+            raw = self.jobs_file.read_bytes()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
         except (json.JSONDecodeError, FileNotFoundError):
             logger.error(f"Failed to load jobs from {self.jobs_file}")
             return {"jobs": []}
+        self._jobs_cache = (st.st_mtime_ns, st.st_size, data)
+        return data
 
     def _save_jobs(self, data: Dict):
         """Save jobs to JSON."""
+        # Saved data has new next_run values; rebuild the heap from it on the next check
+        self._heap_source = None
         try:
-            self.jobs_file.write_text(json.dumps(data, indent=2))
+            if orjson:
+                self.jobs_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                self.jobs_file.write_text(json.dumps(data, indent=2))
+            st = self.jobs_file.stat()
+            self._jobs_cache = (st.st_mtime_ns, st.st_size, data)
         except Exception as e:
+            # Drop the cache so the next load reflects what is actually on disk
+            self._jobs_cache = None
             logger.error(f"Failed to save jobs: {e}")
 
     def _log_job(self, job_id: str, message: str):
@@ -78,11 +253,17 @@ class TaskSchedulerExecutor:
         log_file = self.logs_dir / f"{job_id}.log"
         timestamp = datetime.utcnow().isoformat() + "Z"
         try:
-            with open(log_file, "a") as f:
-                f.write(f"[{timestamp}] {message}\n")
+            # Binary append: one pre-encoded write, no text-layer encoding or newline handling
+            with open(log_file, "ab") as f:
+                f.write(f"[{timestamp}] {message}\n".encode("utf-8"))
         except Exception as e:
             logger.error(f"Failed to log job {job_id}: {e}")
 
+    def _log_jobs(self, job_ids: list, message: str):
+        """Log the same message to each job's log file."""
+        for job_id in job_ids:
+            self._log_job(job_id, message)
+
     def _save_result(self, job_id: str, job_name: str, success: bool, output: str = "", error: str = ""):
         """Save full execution result to results database.
 
@@ -102,8 +283,8 @@ class TaskSchedulerExecutor:
 
         try:
             # Append to JSONL file (one JSON object per line)
-            with open(result_file, "a") as f:
-                f.write(json.dumps(result) + "\n")
+            line = orjson.dumps(result) if orjson else json.dumps(result).encode()
+            self._results.append(result_file, line, b"\n")
         except Exception as e:
             logger.error(f"Failed to save result for job {job_id}: {e}")
 
@@ -111,6 +292,8 @@ class TaskSchedulerExecutor:
         """Send notification to the user who created the job, via their original channel.
 
         Reads job["created_by"] = {"identity": ..., "channel": "telegram"|"webex", "username": ...}
+        Messages are queued for NOTIFY_DEBOUNCE seconds and sent together with any others
+        for the same recipient; returns True once queued.
         Falls back to logging a warning if the channel is unknown or connectors are unavailable.
         """
         job_id = job.get("id", "unknown")
@@ -123,65 +306,103 @@ class TaskSchedulerExecutor:
             self._log_job(job_id, "Notification skipped: no created_by info")
             return False
 
-        if channel == "telegram":
-            return self._send_telegram_to(identity, message, job_id)
-        elif channel == "webex":
-            return self._send_webex_to(identity, message, job_id)
-        else:
+        if channel not in ("telegram", "webex"):
             logger.warning(f"Job {job_id}: unknown notification channel '{channel}'")
             self._log_job(job_id, f"Notification skipped: unknown channel '{channel}'")
             return False
 
-    def _send_telegram_to(self, chat_id: str, message: str, job_id: str) -> bool:
+        # Hold the message briefly so a burst of completions for one recipient goes out as one send
+        key = (channel, identity)
+        with self._notify_lock:
+            pending = self._notify_queues.setdefault(key, [])
+            pending.append((job_id, message))
+            if len(pending) == 1:
+                threading.Timer(NOTIFY_DEBOUNCE, self._flush_notifications, args=(key,)).start()
+        return True
+
+    def _flush_notifications(self, key: tuple):
+        """Send everything queued for one (channel, identity), split to fit one chat message each."""
+        with self._notify_lock:
+            pending = self._notify_queues.pop(key, [])
+        channel, identity = key
+        send = self._send_telegram_to if channel == "telegram" else self._send_webex_to
+
+        job_ids, texts, size = [], [], 0
+        for job_id, message in pending:
+            if texts and size + len(NOTIFY_SEPARATOR) + len(message) > NOTIFY_MAX_CHARS:
+                send(identity, NOTIFY_SEPARATOR.join(texts), job_ids)
+                job_ids, texts, size = [], [], 0
+            size += (len(NOTIFY_SEPARATOR) if texts else 0) + len(message)
+            job_ids.append(job_id)
+            texts.append(message)
+        if texts:
+            send(identity, NOTIFY_SEPARATOR.join(texts), job_ids)
+
+    def _get_connector(self, connector_cls, config_path: Path, token_key: str, token_env: str):
+        """Return a connector for config_path, rebuilt only when the config file changes.
+
+        Returns None if no bot token is configured.
+        """
+        mtime_ns = config_path.stat().st_mtime_ns
+        with self._connectors_lock:
+            cached = self._connectors.get(config_path)
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+
+            with open(config_path) as f:
+                cfg = json.load(f)
+            token = cfg.get(token_key) or os.getenv(token_env, "")
+            if not token:
+                return None
+
+            connector = connector_cls(token, config_file=str(config_path))
+            self._connectors[config_path] = (mtime_ns, connector)
+            return connector
+
+    def _send_telegram_to(self, chat_id: str, message: str, job_ids: list) -> bool:
         """Send a Telegram message directly to a specific chat_id (numeric string)."""
         try:
             if not _TelegramConnector:
                 logger.warning("TelegramConnector not available, skipping Telegram notification")
-                self._log_job(job_id, "Telegram notification skipped: connector unavailable")
+                self._log_jobs(job_ids, "Telegram notification skipped: connector unavailable")
                 return False
 
             script_dir = Path("/opt/n8n-copilot-shim")
             config_path = script_dir / "telegram_config.json"
-            with open(config_path) as f:
-                cfg = json.load(f)
-            token = cfg.get("token") or os.getenv("TELEGRAM_BOT_TOKEN", "")
-            if not token:
+            connector = self._get_connector(_TelegramConnector, config_path, "token", "TELEGRAM_BOT_TOKEN")
+            if not connector:
                 logger.warning("No Telegram bot token configured")
                 return False
 
-            connector = _TelegramConnector(token, config_file=str(config_path))
             connector.send_message(int(chat_id), message)
-            self._log_job(job_id, f"Telegram notification sent to chat_id={chat_id}")
+            self._log_jobs(job_ids, f"Telegram notification sent to chat_id={chat_id}")
             return True
         except Exception as e:
             logger.error(f"Failed to send Telegram notification to {chat_id}: {e}")
-            self._log_job(job_id, f"Telegram notification failed: {e}")
+            self._log_jobs(job_ids, f"Telegram notification failed: {e}")
             return False
 
-    def _send_webex_to(self, email: str, message: str, job_id: str) -> bool:
+    def _send_webex_to(self, email: str, message: str, job_ids: list) -> bool:
         """Send a WebEx message to a specific user by email."""
         try:
             if not _WebEXConnector:
                 logger.warning("WebEXConnector not available, skipping WebEx notification")
-                self._log_job(job_id, "WebEx notification skipped: connector unavailable")
+                self._log_jobs(job_ids, "WebEx notification skipped: connector unavailable")
                 return False
 
             script_dir = Path("/opt/n8n-copilot-shim")
             config_path = script_dir / "webex_config.json"
-            with open(config_path) as f:
-                cfg = json.load(f)
-            token = cfg.get("bot_token") or os.getenv("WEBEX_BOT_TOKEN", "")
-            if not token:
+            connector = self._get_connector(_WebEXConnector, config_path, "bot_token", "WEBEX_BOT_TOKEN")
+            if not connector:
                 logger.warning("No WebEx bot token configured")
                 return False
 
-            connector = _WebEXConnector(token, config_file=str(config_path))
             connector.send_message(email, message)
-            self._log_job(job_id, f"WebEx notification sent to {email}")
+            self._log_jobs(job_ids, f"WebEx notification sent to {email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send WebEx notification to {email}: {e}")
-            self._log_job(job_id, f"WebEx notification failed: {e}")
+            self._log_jobs(job_ids, f"WebEx notification failed: {e}")
             return False
 
     def _execute_task(self, job: Dict) -> Optional[str]:
@@ -282,123 +503,127 @@ class TaskSchedulerExecutor:
                 )
             return None
 
-    def _is_job_ready(self, job: Dict) -> bool:
-        """Check if a job is ready to execute (enabled and time has passed)."""
+    def _next_run_ts(self, job: Dict) -> Optional[float]:
+        """Epoch seconds of an enabled job's next_run, or None if it is disabled or unscheduled."""
         if not job.get("enabled", True):
-            return False
+            return None
 
         next_run_str = job.get("next_run")
         if not next_run_str:
-            return False
+            return None
 
         try:
-            next_run = datetime.fromisoformat(next_run_str.replace("Z", "+00:00")).replace(tzinfo=None)
-            now = datetime.utcnow()
-            return next_run <= now
-        except (ValueError, TypeError):
+            # next_run is UTC wall-clock time; any offset in the string is ignored
+            next_run = datetime.fromisoformat(next_run_str.replace("Z", "+00:00"))
+            return next_run.replace(tzinfo=timezone.utc).timestamp()
+        except (ValueError, TypeError, AttributeError):
             logger.warning(f"Invalid next_run format: {next_run_str}")
-            return False
-
-    def _calculate_next_run(self, schedule: str) -> Optional[str]:
-        """Calculate next run time from schedule string."""
-        from datetime import timedelta
+            return None
 
-        schedule = schedule.lower().strip()
-        now = datetime.utcnow()
+    def _due_heap(self, data: Dict) -> list:
+        """Heap of (next_run epoch, position, job) for scheduled jobs in data.
 
-        # Handle "in X minutes/hours/days" format
-        if schedule.startswith("in "):
-            parts = schedule[3:].split()
-            if len(parts) >= 2:
-                try:
-                    amount = int(parts[0])
-                    unit = parts[1].rstrip('s')
-
-                    if unit == "minute":
-                        next_run = now + timedelta(minutes=amount)
-                    elif unit == "hour":
-                        next_run = now + timedelta(hours=amount)
-                    elif unit == "second":
-                        next_run = now + timedelta(seconds=amount)
-                    elif unit == "day":
-                        next_run = now + timedelta(days=amount)
-                    else:
-                        return None
-
-                    return next_run.isoformat() + "Z"
-                except ValueError:
-                    return None
-
-        # Handle "every X minutes/hours/days" format
-        if schedule.startswith("every "):
-            parts = schedule[6:].split()
-            if len(parts) >= 2:
-                try:
-                    amount = int(parts[0])
-                    unit = parts[1].rstrip('s')
-
-                    if unit == "minute":
-                        next_run = now + timedelta(minutes=amount)
-                    elif unit == "hour":
-                        next_run = now + timedelta(hours=amount)
-                    elif unit == "day":
-                        next_run = now + timedelta(days=amount)
-                    else:
-                        return None
-
-                    return next_run.isoformat() + "Z"
-                except ValueError:
-                    return None
+        Rebuilt only when the jobs data is re-read or saved, so a check with
+        nothing due costs a peek at the top of the heap.
+        """
+        if self._heap_source is not data:
+            heap = []
+            for position, job in enumerate(data.get("jobs", [])):
+                ts = self._next_run_ts(job)
+                if ts is not None:
+                    heap.append((ts, position, job))
+            heapq.heapify(heap)
+            self._heap, self._heap_source = heap, data
+        return self._heap
 
+    def _calculate_next_run(self, schedule: str) -> Optional[str]:
+        """Calculate next run time from schedule string."""
+        interval = _schedule_interval(schedule)
+        if interval is not None:
+            try:
+                return (datetime.utcnow() + interval).isoformat() + "Z"
+            except OverflowError:
+                pass
         logger.warning(f"Could not parse schedule: {schedule}")
         return None
 
-    def check_and_execute(self):
-        """Check for ready jobs and execute them."""
-        data = self._load_jobs()
+    def _record_run(self, job: Dict):
+        """Stamp last_run and work out the next run (or disable) after a job has executed."""
+        job_id = job["id"]
+        now = datetime.utcnow()
+        job["last_run"] = now.isoformat() + "Z"
 
-        for job in data.get("jobs", []):
-            if not self._is_job_ready(job):
-                continue
+        # Handle recurring vs one-time jobs
+        recurring = job.get("recurring", True)  # Default: recurring
 
-            job_id = job["id"]
-            logger.info(f"Job ready: {job_id}")
+        if recurring:
+            # Recurring job - calculate next run
+            next_run = self._calculate_next_run(job.get("schedule", ""))
+            if next_run:
+                job["next_run"] = next_run
+            else:
+                # If we can't calculate next run, disable the job
+                job["enabled"] = False
+                self._log_job(job_id, "Could not calculate next run, disabling job")
+        else:
+            # One-time job - disable after running
+            job["enabled"] = False
+            self._log_job(job_id, "One-time job completed, disabling")
 
-            # Execute the job
-            result = self._execute_task(job)
+    def _run_job(self, job: Dict):
+        """Execute a job on a pool thread, then record the run in jobs.json."""
+        job_id = job["id"]
+        try:
+            self._execute_task(job)
+        finally:
+            with self._jobs_lock:
+                self._running.discard(job_id)
+                # Re-load so edits made through the CLI while the job ran are kept
+                data = self._load_jobs()
+                for current in data.get("jobs", []):
+                    if current.get("id") == job_id:
+                        self._record_run(current)
+                        self._save_jobs(data)
+                        break
+                else:
+                    logger.info(f"Job {job_id} was removed while running, not updating it")
 
-            # Update job record
-            now = datetime.utcnow()
-            job["last_run"] = now.isoformat() + "Z"
+    def check_and_execute(self) -> float:
+        """Check for ready jobs and hand them to the worker pool.
 
-            # Handle recurring vs one-time jobs
-            recurring = job.get("recurring", True)  # Default: recurring
+        A job that is still running is not started again. Returns the number
+        of seconds until the next job is due, capped at MAX_IDLE_WAIT.
+        """
+        with self._jobs_lock:
+            heap = self._due_heap(self._load_jobs())
+            now = time.time()
 
-            if recurring:
-                # Recurring job - calculate next run
-                next_run = self._calculate_next_run(job.get("schedule", ""))
-                if next_run:
-                    job["next_run"] = next_run
-                else:
-                    # If we can't calculate next run, disable the job
-                    job["enabled"] = False
-                    self._log_job(job_id, "Could not calculate next run, disabling job")
-            else:
-                # One-time job - disable after running
-                job["enabled"] = False
-                self._log_job(job_id, "One-time job completed, disabling")
+            # Due jobs leave the heap; a finished job's save rebuilds it with the new next_run
+            while heap and heap[0][0] <= now:
+                job = heapq.heappop(heap)[2]
+                if job.get("id") in self._running:
+                    continue
+
+                job_id = job["id"]
+                logger.info(f"Job ready: {job_id}")
+                self._running.add(job_id)
+                self._pool.submit(self._run_job, job)
 
-        self._save_jobs(data)
+            if not heap:
+                return MAX_IDLE_WAIT
+            return min(heap[0][0] - now, MAX_IDLE_WAIT)
 
     def run(self):
-        """Main executor loop - runs forever, checking every 1 second."""
+        """Main executor loop - runs forever, sleeping until the next job is due or jobs.json changes."""
         logger.info("Task scheduler executor started")
 
         try:
             while True:
                 try:
-                    self.check_and_execute()
-                    time.sleep(1)  # Check every 1 second
+                    timeout = self.check_and_execute()
+                    if self._watcher.wait(timeout):
+                        # Written by someone else (or by us); re-read rather than trust the mtime
+                        self._jobs_cache = None
                 except Exception as e:
                     logger.error(f"Error in execution loop: {e}")
                     time.sleep(1)